@@ -54,7 +54,7 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 5
+LIBPATCH = 6
 
 RELATION_NAME = "ui-endpoint-info"
 INTERFACE_NAME = "login_ui_endpoints"
@@ -106,14 +106,17 @@ class LoginUIEndpointsProvider(Object):
         self.on.ready.emit()
 
     def send_endpoints_relation_data(self, data: LoginUIProviderData) -> None:
-        """Updates relation with endpoint info."""
+        """Updates relation with endpoint info, only writing the changed keys."""
         if not self._charm.unit.is_leader():
             return None
 
         relations = self.model.relations[self._relation_name]
+        endpoints = data.model_dump(exclude_none=True)
 
         for relation in relations:
-            relation.data[self._charm.app].update(data.model_dump(exclude_none=True))
+            databag = relation.data[self._charm.app]
+            if changed := {k: v for k, v in endpoints.items() if databag.get(k) != v}:
+                databag.update(changed)
 
 
 class LoginUIEndpointsRelationError(Exception):
@@ -3,7 +3,12 @@
 
 """Helper class for trusting ca chains."""
 
-import subprocess
+import base64
+import binascii
+import hashlib
+import logging
+import re
+from functools import cached_property
 from pathlib import Path
 from typing import Callable, Union
 
@@ -12,15 +17,37 @@ from charms.certificate_transfer_interface.v0.certificate_transfer import (
     CertificateRemovedEvent,
     CertificateTransferRequires,
 )
-from ops import CharmBase, Object
+from opentelemetry import trace
+from ops import CharmBase, Object, StoredState, WorkloadEvent
 
 from constants import CERTIFICATE_TRANSFER_NAME
 
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
 LOCAL_CA_CERTS_PATH = Path("/usr/local/share/ca-certificates")
 BUNDLE_PATH = "/etc/ssl/certs/ca-certificates.crt"
+PEM_CERTIFICATE_RE = re.compile(
+    r"-----BEGIN CERTIFICATE-----\s*(.+?)\s*-----END CERTIFICATE-----", re.DOTALL
+)
+
+
+def parse_certificates(pem: str) -> dict[str, str]:
+    """Parse PEM certificates into a mapping keyed by their SHA-256 fingerprint."""
+    certificates = {}
+    for match in PEM_CERTIFICATE_RE.finditer(pem):
+        try:
+            der = base64.b64decode("".join(match[1].split()), validate=True)
+        except binascii.Error:
+            logger.warning("Skipping a malformed PEM certificate")
+            continue
+        certificates[hashlib.sha256(der).hexdigest()] = match[0]
+    return certificates
 
 
 class CertTransfer(Object):
+    _stored = StoredState()
+
     def __init__(
         self,
         charm: CharmBase,
@@ -36,6 +63,11 @@ class CertTransfer(Object):
         self.callback_fn = callback_fn
         self.bundle_name = bundle_name
 
+        self._stored.set_default(bundle_digest=None)
+
+        self.framework.observe(
+            charm.on[container_name].pebble_ready, self._on_workload_pebble_ready
+        )
         self.framework.observe(
             self.cert_transfer.on.certificate_available, self._on_certificate_event
         )
@@ -52,22 +84,42 @@ class CertTransfer(Object):
                     bundle.add(ca)
         return "\n".join(sorted(bundle))
 
+    @cached_property
+    def _system_certificates(self) -> dict[str, str]:
+        """The certificates trusted by the charm container's system bundle."""
+        try:
+            with open(BUNDLE_PATH) as f:
+                return parse_certificates(f.read())
+        except FileNotFoundError:
+            logger.warning(f"System CA bundle {BUNDLE_PATH} not found")
+            return {}
+
+    @tracer.start_as_current_span("CertTransfer.push_ca_certs")
     def push_ca_certs(self) -> None:
-        """Push the cert bundle to the container."""
+        """Push the cert bundle to the container.
+
+        The bundle is only rebuilt and pushed when its digest differs from the
+        one recorded after the last successful push.
+        """
         bundle = self.ca_bundle
-        filename = Path(LOCAL_CA_CERTS_PATH / self.bundle_name)
-        with open(filename, mode="wt") as f:
-            f.write(bundle)
+        digest = hashlib.sha256(bundle.encode()).hexdigest()
+        if digest == self._stored.bundle_digest:
+            logger.debug("CA bundle is unchanged, skipping the push")
+            return
 
-        subprocess.run(["update-ca-certificates", "--fresh"], capture_output=True)
+        certificates = {**self._system_certificates, **parse_certificates(bundle)}
+        self.container.push(BUNDLE_PATH, "\n".join(certificates.values()) + "\n", make_dirs=True)
 
-        with open(BUNDLE_PATH) as f:
-            self.container.push(BUNDLE_PATH, f, make_dirs=True)
+        self._stored.bundle_digest = digest
 
     def clean_ca_certs(self) -> None:
         """Remove the cert bundle from the container."""
         self.container.remove_path(LOCAL_CA_CERTS_PATH / self.bundle_name)
 
+    def _on_workload_pebble_ready(self, event: WorkloadEvent) -> None:
+        # A (re)started workload container no longer holds the pushed bundle
+        self._stored.bundle_digest = None
+
     def _on_certificate_event(
         self, event: Union[CertificateAvailableEvent, CertificateRemovedEvent]
     ) -> None:
@@ -7,10 +7,13 @@
 """A Juju charm for Identity Platform Login UI."""
 
 import logging
+import math
 import secrets
-from typing import Optional
+from decimal import Decimal
+from functools import cached_property
+from typing import TYPE_CHECKING, Iterable, Optional
 
-from charms.grafana_k8s.v0.grafana_dashboard import GrafanaDashboardProvider
+import ops
 from charms.hydra.v0.hydra_endpoints import (
     HydraEndpointsRequirer,
 )
@@ -19,38 +22,41 @@ from charms.identity_platform_login_ui_operator.v0.login_ui_endpoints import (
     LoginUIProviderData,
 )
 from charms.kratos.v0.kratos_info import KratosInfoRequirer
-from charms.loki_k8s.v1.loki_push_api import LogForwarder
-from charms.observability_libs.v0.kubernetes_compute_resources_patch import (
-    K8sResourcePatchFailedEvent,
-    KubernetesComputeResourcesPatch,
-    ResourceRequirements,
-    adjust_resource_requirements,
-)
-from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
 from charms.tempo_k8s.v2.tracing import TracingEndpointRequirer
 from charms.tenant_service.v0.tenant_service_info import TenantServiceInfoRequirer
 from charms.traefik_k8s.v0.traefik_route import TraefikRouteRequirer
 from ops import (
+    ActionEvent,
     ActiveStatus,
     BlockedStatus,
     CharmBase,
+    CommitEvent,
     ConfigChangedEvent,
+    EventBase,
     HookEvent,
     MaintenanceStatus,
+    PebbleCheckFailedEvent,
+    PebbleCheckRecoveredEvent,
+    PreCommitEvent,
     Relation,
     RelationBrokenEvent,
     RelationEvent,
+    StoredState,
+    UpdateStatusEvent,
     WaitingStatus,
     WorkloadEvent,
     main,
 )
+from ops.pebble import Error as PebbleError
 from ops.pebble import Layer
 
 from certificate_transfer_integration import CertTransfer
+from configs import GoRuntimeConfig, HealthCheckConfig, ResourceRequestConfig
 from constants import (
     APPLICATION_PORT,
     CERTIFICATE_TRANSFER_NAME,
     COOKIES_KEY,
+    DEFAULT_RESOURCE_REQUESTS,
     GRAFANA_INTEGRATION_NAME,
     HYDRA_INTEGRATION_NAME,
     KRATOS_INTEGRATION_NAME,
@@ -60,28 +66,60 @@ from constants import (
     PUBLIC_ROUTE_INTEGRATION_NAME,
     TENANT_SERVICE_INFO_INTEGRATION_NAME,
     TRACING_INTEGRATION_NAME,
+    WORKLOAD_CHECKS,
     WORKLOAD_CONTAINER_NAME,
 )
-from exceptions import PebbleServiceError
-from integrations import (
-    HydraEndpointData,
-    KratosInfoData,
-    PublicRouteData,
-    TenantServiceInfoData,
-    TracingData,
+from exceptions import InvalidConfigError, PebbleServiceError, RestartLockPendingError
+from hook_profiling import HOOK_PROFILES_PATH, HookProfiler, summarise_hook_profiles
+from integrations import IntegrationSnapshot
+from reconciler import ALL_INPUTS, Input, Reconciler
+from restart_lock import RestartLock
+from services import PebbleService, WorkloadService, layer_digest
+from utils import (
+    dispatched_hook,
+    go_runtime_environment,
+    observes_dispatch,
+    parse_quantity,
+    relation_hooks,
 )
-from services import PebbleService, WorkloadService
-from utils import normalise_url
+
+if TYPE_CHECKING:
+    from charms.grafana_k8s.v0.grafana_dashboard import GrafanaDashboardProvider
+    from charms.loki_k8s.v1.loki_push_api import LogForwarder
+    from charms.observability_libs.v0.kubernetes_compute_resources_patch import (
+        K8sResourcePatchFailedEvent,
+        KubernetesComputeResourcesPatch,
+        ResourceRequirements,
+    )
+    from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
 
 logger = logging.getLogger(__name__)
 
+WORKLOAD_PEBBLE_READY_HOOK = f"{WORKLOAD_CONTAINER_NAME}-pebble-ready"
+
 
 class IdentityPlatformLoginUiOperatorCharm(CharmBase):
     """Charmed Identity Platform Login UI."""
 
+    _stored = StoredState()
+
     def __init__(self, *args):
         """Initialize Charm."""
         super().__init__(*args)
+        self._stored.set_default(
+            plan_digest="",
+            workload_fingerprint="",
+            hook_profiling=False,
+            pending_inputs=[],
+            workload_ready=False,
+        )
+
+        # Profile the whole dispatch, from here to the framework commit
+        self._hook_profiler: Optional[HookProfiler] = None
+        if self._stored.hook_profiling:
+            self._hook_profiler = HookProfiler(dispatched_hook(), HOOK_PROFILES_PATH)
+            self._hook_profiler.start()
+            self.framework.observe(self.framework.on.commit, self._on_commit)
 
         self._workload_service = WorkloadService(self.unit)
         self._pebble_service = PebbleService(self.unit)
@@ -110,70 +148,105 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
             self, relation_name=TRACING_INTEGRATION_NAME, protocols=["otlp_http", "otlp_grpc"]
         )
 
-        self.metrics_endpoint = MetricsEndpointProvider(
-            self,
-            relation_name=PROMETHEUS_INTEGRATION_NAME,
-            jobs=[
-                {
-                    "metrics_path": "/api/v0/metrics",
-                    "static_configs": [{"targets": [f"*:{APPLICATION_PORT}"]}],
-                }
-            ],
-        )
-
-        # Loki
-        self._log_forwarder = LogForwarder(self, relation_name=LOGGING_INTEGRATION_NAME)
-
-        # Grafana
-        self._grafana_dashboards = GrafanaDashboardProvider(
-            self, relation_name=GRAFANA_INTEGRATION_NAME
+        # Rolling restarts
+        self._restart_lock = RestartLock(
+            self, PEER_INTEGRATION_NAME, lambda: self._max_concurrent_restarts
         )
 
         # Certificate transfer
         self.cert_transfer = CertTransfer(
             self,
             WORKLOAD_CONTAINER_NAME,
-            self._holistic_handler,
+            self._on_ca_certs_changed,
             CERTIFICATE_TRANSFER_NAME,
         )
 
-        self.resources_patch = KubernetesComputeResourcesPatch(
-            self,
-            WORKLOAD_CONTAINER_NAME,
-            resource_reqs_func=self._resource_reqs_from_config,
+        # The observability and resource patch libraries are only imported and
+        # built on the dispatches they observe
+        self.metrics_endpoint: Optional["MetricsEndpointProvider"] = None
+        if observes_dispatch(
+            relation_hooks(PROMETHEUS_INTEGRATION_NAME) | {WORKLOAD_PEBBLE_READY_HOOK}
+        ):
+            self.metrics_endpoint = self._build_metrics_endpoint()
+
+        # Loki
+        self._log_forwarder: Optional["LogForwarder"] = None
+        if observes_dispatch(
+            relation_hooks(LOGGING_INTEGRATION_NAME) | {WORKLOAD_PEBBLE_READY_HOOK}
+        ):
+            self._log_forwarder = self._build_log_forwarder()
+
+        # Grafana
+        self._grafana_dashboards: Optional["GrafanaDashboardProvider"] = None
+        if observes_dispatch(
+            relation_hooks(GRAFANA_INTEGRATION_NAME) | {"leader-elected", "upgrade-charm"}
+        ):
+            self._grafana_dashboards = self._build_grafana_dashboards()
+
+        self.resources_patch: Optional["KubernetesComputeResourcesPatch"] = None
+        if observes_dispatch({"config-changed"}):
+            self.resources_patch = self._build_resources_patch()
+
+        self._reconciler = Reconciler()
+        self._reconciler.add_step(
+            "cookie-key", [Input.PEERS, Input.WORKLOAD], self._ensure_cookie_encryption_key
+        )
+        self._reconciler.add_step("public-route", [Input.PUBLIC_ROUTE], self._submit_public_route)
+        self._reconciler.add_step(
+            "ca-certs", [Input.CERTIFICATES, Input.WORKLOAD], self.cert_transfer.push_ca_certs
+        )
+        # The charm traces are sent over TLS with the received CA bundle
+        self._reconciler.add_step(
+            "charm-tracing", [Input.TRACING, Input.CERTIFICATES], self._set_charm_tracing
         )
+        self._reconciler.add_step(
+            "pebble-layer",
+            ALL_INPUTS - {Input.CERTIFICATES},
+            self._plan_pebble_layer,
+            after=["cookie-key"],
+        )
+
+        # The inputs changed by the event handlers are reconciled together at the end of the dispatch
+        self.framework.observe(self.framework.on.pre_commit, self._on_pre_commit)
 
         self.framework.observe(self.on.login_ui_pebble_ready, self._on_login_ui_pebble_ready)
+        self.framework.observe(
+            self.on.login_ui_pebble_check_failed, self._on_login_ui_pebble_check_failed
+        )
+        self.framework.observe(
+            self.on.login_ui_pebble_check_recovered, self._on_login_ui_pebble_check_recovered
+        )
         self.framework.observe(self.on.config_changed, self._on_config_changed)
-        self.framework.observe(self.on.update_status, self._holistic_handler)
+        self.framework.observe(self.on.update_status, self._on_update_status)
+        self.framework.observe(self.on.get_hook_profiles_action, self._on_get_hook_profiles_action)
 
         self.framework.observe(
-            self.on[KRATOS_INTEGRATION_NAME].relation_changed, self._holistic_handler
+            self.on[KRATOS_INTEGRATION_NAME].relation_changed, self._on_integration_changed
         )
         self.framework.observe(
             self.on[TENANT_SERVICE_INFO_INTEGRATION_NAME].relation_changed,
-            self._holistic_handler,
+            self._on_integration_changed,
         )
         self.framework.observe(
             self.on[TENANT_SERVICE_INFO_INTEGRATION_NAME].relation_broken,
-            self._holistic_handler,
+            self._on_integration_changed,
         )
         self.framework.observe(
             self.endpoints_provider.on.ready, self._update_login_ui_endpoint_relation_data
         )
         self.framework.observe(
-            self.on[HYDRA_INTEGRATION_NAME].relation_changed, self._holistic_handler
+            self.on[HYDRA_INTEGRATION_NAME].relation_changed, self._on_integration_changed
         )
 
-        self.framework.observe(self.tracing.on.endpoint_changed, self._holistic_handler)
-        self.framework.observe(self.tracing.on.endpoint_removed, self._holistic_handler)
+        self.framework.observe(self.tracing.on.endpoint_changed, self._on_integration_changed)
+        self.framework.observe(self.tracing.on.endpoint_removed, self._on_integration_changed)
 
         # peers
         self.framework.observe(
-            self.on[PEER_INTEGRATION_NAME].relation_created, self._holistic_handler
+            self.on[PEER_INTEGRATION_NAME].relation_created, self._on_integration_changed
         )
         self.framework.observe(
-            self.on[PEER_INTEGRATION_NAME].relation_changed, self._holistic_handler
+            self.on[PEER_INTEGRATION_NAME].relation_changed, self._on_integration_changed
         )
 
         # public route
@@ -190,11 +263,43 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
             self._on_public_route_broken,
         )
 
-        # resource patching
-        self.framework.observe(
-            self.resources_patch.on.patch_failed, self._on_resource_patch_failed
+    def _build_metrics_endpoint(self) -> "MetricsEndpointProvider":
+        from charms.prometheus_k8s.v0.prometheus_scrape import MetricsEndpointProvider
+
+        return MetricsEndpointProvider(
+            self,
+            relation_name=PROMETHEUS_INTEGRATION_NAME,
+            jobs=[
+                {
+                    "metrics_path": "/api/v0/metrics",
+                    "static_configs": [{"targets": [f"*:{APPLICATION_PORT}"]}],
+                }
+            ],
+        )
+
+    def _build_log_forwarder(self) -> "LogForwarder":
+        from charms.loki_k8s.v1.loki_push_api import LogForwarder
+
+        return LogForwarder(self, relation_name=LOGGING_INTEGRATION_NAME)
+
+    def _build_grafana_dashboards(self) -> "GrafanaDashboardProvider":
+        from charms.grafana_k8s.v0.grafana_dashboard import GrafanaDashboardProvider
+
+        return GrafanaDashboardProvider(self, relation_name=GRAFANA_INTEGRATION_NAME)
+
+    def _build_resources_patch(self) -> "KubernetesComputeResourcesPatch":
+        from charms.observability_libs.v0.kubernetes_compute_resources_patch import (
+            KubernetesComputeResourcesPatch,
         )
 
+        resources_patch = KubernetesComputeResourcesPatch(
+            self,
+            WORKLOAD_CONTAINER_NAME,
+            resource_reqs_func=self._resource_reqs_from_config,
+        )
+        self.framework.observe(resources_patch.on.patch_failed, self._on_resource_patch_failed)
+        return resources_patch
+
     def _on_login_ui_pebble_ready(self, event: WorkloadEvent) -> None:
         """Define and start a workload using the Pebble API."""
         self.unit.status = MaintenanceStatus("Configuring resources")
@@ -205,15 +310,88 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
 
         self._workload_service.open_port()
 
-        self._workload_service.set_version()
+        self._set_workload_version()
         self._holistic_handler(event)
 
+    def _on_login_ui_pebble_check_failed(self, event: PebbleCheckFailedEvent) -> None:
+        """Stop reporting the unit active as soon as the workload fails a health check.
+
+        The failing ready check takes the pod out of the Kubernetes service endpoints,
+        and Pebble restarts the workload itself when its alive check fails.
+        """
+        if event.info.name not in WORKLOAD_CHECKS:
+            return
+
+        logger.warning(f"The workload failed its {event.info.name} check")
+        self._stored.workload_ready = False
+        self.unit.status = WaitingStatus("Waiting for the workload to be ready")
+
+    def _on_login_ui_pebble_check_recovered(self, event: PebbleCheckRecoveredEvent) -> None:
+        if event.info.name not in WORKLOAD_CHECKS:
+            return
+
+        logger.info(f"The workload recovered its {event.info.name} check")
+        self._update_ready_status()
+
+    def _set_workload_version(self) -> None:
+        """Set the workload version, only querying the binary after it changed."""
+        fingerprint = self._workload_service.binary_fingerprint
+        if fingerprint and fingerprint == self._stored.workload_fingerprint:
+            return
+
+        if self._workload_service.set_version():
+            self._stored.workload_fingerprint = fingerprint
+
     def _on_config_changed(self, event: ConfigChangedEvent) -> None:
         """Handle changed configuration."""
         self.unit.status = MaintenanceStatus("Configuring resources")
+        self._stored.hook_profiling = self._hook_profiling
+        self._reconcile([Input.CONFIG])
+
+    def _on_update_status(self, event: UpdateStatusEvent) -> None:
+        """Verify the workload health, reconcile only when it drifted."""
+        if self._stored.plan_digest and self._is_workload_up_to_date():
+            self._update_ready_status()
+            return
+
+        logger.info("Workload drifted from the last applied plan, reconciling")
         self._holistic_handler(event)
 
+    def _on_commit(self, event: CommitEvent) -> None:
+        if self._hook_profiler:
+            self._hook_profiler.stop()
+
+    def _on_get_hook_profiles_action(self, event: ActionEvent) -> None:
+        if not (summary := summarise_hook_profiles(HOOK_PROFILES_PATH, event.params["limit"])):
+            event.fail("No hook profiles were recorded, enable the hook_profiling option")
+            return
+
+        event.set_results(summary)
+
+    def _on_integration_changed(self, event: RelationEvent) -> None:
+        self._reconcile([Input(event.relation.name)])
+
+    def _on_ca_certs_changed(self, event: EventBase) -> None:
+        self._reconcile([Input.CERTIFICATES])
+
     def _holistic_handler(self, event: HookEvent) -> None:
+        self._reconcile(ALL_INPUTS)
+
+    def _reconcile(self, changed: Iterable[Input]) -> None:
+        """Mark the inputs as changed, they are reconciled once the dispatch ends.
+
+        The inputs stay pending across dispatches while the reconcile cannot
+        run, e.g. while waiting for the restart lock.
+        """
+        pending = set(self._stored.pending_inputs).union(Input(i).value for i in changed)
+        self._stored.pending_inputs = sorted(pending)
+
+    def _on_pre_commit(self, event: PreCommitEvent) -> None:
+        self._release_restart_lock()
+
+        if not (pending := {Input(i) for i in self._stored.pending_inputs}):
+            return
+
         if not self._pebble_service.can_connect():
             self.unit.status = WaitingStatus("Waiting to connect to Login_UI container")
             return
@@ -222,29 +400,98 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
             self.unit.status = WaitingStatus("Waiting for peer relation")
             return
 
+        try:
+            self._reconciler.reconcile(pending)
+        except InvalidConfigError as err:
+            logger.error(str(err))
+            self.unit.status = BlockedStatus(str(err))
+            return
+        except RestartLockPendingError as err:
+            logger.info(str(err))
+            self.unit.status = WaitingStatus("Waiting for the restart lock")
+            return
+        except PebbleServiceError as err:
+            logger.error(str(err))
+            self.unit.status = BlockedStatus("Failed to replan, please consult the logs")
+            return
+
+        self._stored.pending_inputs = []
+
+    def _ensure_cookie_encryption_key(self) -> None:
         if self.unit.is_leader() and not self._cookie_encryption_key:
             self._peers.data[self.app][COOKIES_KEY] = secrets.token_hex(16)
 
+    def _submit_public_route(self) -> None:
         if (
             self.unit.is_leader()
-            and self.public_route.is_ready()
+            and self._integrations.public_route is not None
             and self.public_route._relation.app is not None
         ):
-            public_route_config = PublicRouteData.load(self.public_route).config
-            self.public_route.submit_to_traefik(public_route_config)
+            self._integrations.public_route.submit(self.public_route)
 
-        self.cert_transfer.push_ca_certs()
+    def _set_charm_tracing(self) -> None:
+        url = self._integrations.tracing.charm_traces_url
+        ca = self.cert_transfer.ca_bundle if url and url.startswith("https://") else ""
+        ops.tracing.set_destination(url=url, ca=ca or None)
 
-        logger.info("Pebble plan updated with new configuration, replanning")
+    def _is_workload_up_to_date(self) -> bool:
         try:
-            self._pebble_service.plan(self._login_ui_layer)
-        except PebbleServiceError as err:
-            logger.error(str(err))
-            self.unit.status = BlockedStatus("Failed to replan, please consult the logs")
+            return (
+                self._pebble_service.current_plan_digest() == self._stored.plan_digest
+                and self._pebble_service.is_running()
+            )
+        except PebbleError as err:
+            logger.info(f"Failed to query the workload state: {err}")
+            return False
+
+    def _plan_pebble_layer(self) -> None:
+        health_check = HealthCheckConfig.load(self.config)
+        layer = self._render_login_ui_layer(self._integrations, health_check)
+        restarted = self._pebble_service.plan(layer, self._restart_lock.acquire)
+        if restarted:
+            self._stored.workload_ready = False
+        if not (restarted and self._restart_lock.held):
+            # Withdraw a request no longer needed, e.g. the change was reverted
+            # while waiting or the workload was started without the lock
+            self._restart_lock.release()
+        self._stored.plan_digest = layer_digest(layer)
+        # Not waiting for the restarted workload, the recovered check or
+        # update-status reports it active once it passes its ready check
+        self._update_ready_status()
+        self._release_restart_lock()
+
+    def _update_ready_status(self) -> None:
+        """Go active and publish the endpoints once the workload passed its ready check.
+
+        The readiness is only queried until the check first passes after a restart.
+        """
+        if not self._stored.workload_ready:
+            if not self._pebble_service.is_ready():
+                self.unit.status = WaitingStatus("Waiting for the workload to be ready")
+                return
+            self._stored.workload_ready = True
+            self._update_login_ui_endpoint_relation_data()
+
+        # Surface a failed or rolling out resources patch, only built on config-changed
+        if self.resources_patch and not isinstance(
+            status := self.resources_patch.get_status(), ActiveStatus
+        ):
+            self.unit.status = status
             return
 
         self.unit.status = ActiveStatus()
 
+    def _release_restart_lock(self) -> None:
+        """Release the restart lock once the restarted workload passes its checks.
+
+        Not waiting for the workload, a later hook such as the recovered check
+        or update-status releases the lock.
+        """
+        if self._restart_lock.held and (
+            self._pebble_service.is_alive() or self._pebble_service.is_ready()
+        ):
+            self._restart_lock.release()
+
     def _on_public_route_changed(self, event: RelationEvent) -> None:
         self.unit.status = MaintenanceStatus("Configuring resources")
 
@@ -254,7 +501,7 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
         if not self.public_route.is_ready():
             return
 
-        self._holistic_handler(event)
+        self._reconcile([Input.PUBLIC_ROUTE])
         self._update_login_ui_endpoint_relation_data(event)
 
     def _on_public_route_broken(self, event: RelationBrokenEvent) -> None:
@@ -263,9 +510,9 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
         # needed due to how traefik_route lib is handling the event
         self.public_route._relation = event.relation
 
-        self._holistic_handler(event)
+        self._reconcile([Input.PUBLIC_ROUTE])
 
-    def _on_resource_patch_failed(self, event: K8sResourcePatchFailedEvent) -> None:
+    def _on_resource_patch_failed(self, event: "K8sResourcePatchFailedEvent") -> None:
         logger.error(f"Failed to patch resource constraints: {event.message}")
         self.unit.status = BlockedStatus(event.message)
 
@@ -290,33 +537,92 @@ class IdentityPlatformLoginUiOperatorCharm(CharmBase):
         return self.config.get("support_email")
 
     @property
-    def _domain_url(self) -> Optional[str]:
-        return (
-            normalise_url(str(PublicRouteData.load(self.public_route).url))
-            if self.public_route.is_ready()
-            else None
-        )
+    def _max_concurrent_restarts(self) -> int:
+        return self.config.get("max_concurrent_restarts", 1)
 
     @property
-    def _login_ui_layer(self) -> Layer:
+    def _hook_profiling(self) -> bool:
+        return self.config.get("hook_profiling", False)
+
+    @cached_property
+    def _integrations(self) -> IntegrationSnapshot:
+        """The integration data, read once per dispatch."""
+        return IntegrationSnapshot.load(
+            hydra_endpoints=self.hydra_endpoints,
+            kratos_info=self._kratos_info,
+            tracing=self.tracing,
+            tenant_service_info=self._tenant_service_info,
+            public_route=self.public_route,
+        )
+
+    def _render_login_ui_layer(
+        self, integrations: IntegrationSnapshot, health_check: HealthCheckConfig
+    ) -> Layer:
+        go_runtime = GoRuntimeConfig.load(self.config)
+        limits = self._resource_reqs_from_config().limits or {}
         return self._pebble_service.render_pebble_layer(
-            self._domain_url,
+            integrations.domain_url,
             self._cookie_encryption_key,
             self._log_level,
             self._support_email,
-            HydraEndpointData.load(self.hydra_endpoints),
-            KratosInfoData.load(self._kratos_info),
-            TracingData.load(self.tracing),
-            TenantServiceInfoData.load(self._tenant_service_info),
+            integrations.hydra_endpoint,
+            integrations.kratos_info,
+            integrations.tracing,
+            integrations.tenant_service_info,
+            health_check=health_check,
+            go_runtime=go_runtime_environment(
+                limits.get("cpu"),
+                limits.get("memory"),
+                gomaxprocs=go_runtime.gomaxprocs,
+                gomemlimit=go_runtime.gomemlimit,
+            ),
+        )
+
+    def _resource_reqs_from_config(self) -> "ResourceRequirements":
+        from charms.observability_libs.v0.kubernetes_compute_resources_patch import (
+            adjust_resource_requirements,
+            is_valid_spec,
+            sanitize_resource_spec_dict,
         )
 
-    def _resource_reqs_from_config(self) -> ResourceRequirements:
-        limits = {"cpu": self.model.config.get("cpu"), "memory": self.model.config.get("memory")}
-        requests = {"cpu": "100m", "memory": "200Mi"}
+        limit_spec = {
+            "cpu": self.model.config.get("cpu"),
+            "memory": self.model.config.get("memory"),
+        }
+        request_spec = {
+            "cpu": self.model.config.get("cpu_request"),
+            "memory": self.model.config.get("memory_request"),
+        }
+        for spec in (limit_spec, request_spec):
+            if not is_valid_spec(spec, debug=True):
+                raise InvalidConfigError(f"Invalid resource spec: {spec}")
+        limits: dict[str, str] = sanitize_resource_spec_dict(limit_spec) or {}
+        requests: dict[str, str] = sanitize_resource_spec_dict(request_spec) or {}
+
+        ratio = ResourceRequestConfig.load(self.model.config).ratio
+
+        for resource, default in DEFAULT_RESOURCE_REQUESTS.items():
+            if resource in requests:
+                continue
+            if ratio and (limit := parse_quantity(limits.get(resource))):
+                # Whole millicores and bytes
+                request = limit * Decimal(str(ratio))
+                requests[resource] = (
+                    f"{math.ceil(request * 1000)}m"
+                    if resource == "cpu"
+                    else str(math.ceil(request))
+                )
+            else:
+                requests[resource] = default
+
         return adjust_resource_requirements(limits, requests, adhere_to_requests=True)
 
-    def _update_login_ui_endpoint_relation_data(self, _: RelationEvent) -> None:
-        endpoint = self._domain_url or ""
+    def _update_login_ui_endpoint_relation_data(self, _: Optional[EventBase] = None) -> None:
+        # Published once the workload is ready, so that no traffic reaches a cold process
+        if not self._stored.workload_ready:
+            return
+
+        endpoint = self._integrations.domain_url or ""
 
         self.endpoints_provider.send_endpoints_relation_data(
             LoginUIProviderData(
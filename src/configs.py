@@ -0,0 +1,106 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import re
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from exceptions import InvalidConfigError
+
+# A Go time.Duration, such as "30s" or "1m30s"
+GO_DURATION_RE = re.compile(r"(?:[0-9]+(?:\.[0-9]+)?(?:ns|us|µs|ms|s|m|h))+")
+# A GOMEMLIMIT, a byte count with an optional IEC unit or "off"
+GOMEMLIMIT_RE = re.compile(r"off|[0-9]+(?:B|KiB|MiB|GiB|TiB)?")
+_GO_DURATION_PART_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)(ns|us|µs|ms|s|m|h)")
+_GO_DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "ms": 1e-3,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+}
+
+
+def duration_seconds(value: str) -> float:
+    """The seconds in a Go time.Duration, e.g. 90 for both "90s" and "1m30s"."""
+    if not GO_DURATION_RE.fullmatch(value):
+        raise ValueError(f"Invalid duration {value!r}")
+    return sum(
+        float(amount) * _GO_DURATION_UNITS[unit]
+        for amount, unit in _GO_DURATION_PART_RE.findall(value)
+    )
+
+
+def _duration(config: Mapping[str, Any], option: str, default: str) -> str:
+    value = config.get(option, default)
+    if not GO_DURATION_RE.fullmatch(value):
+        raise InvalidConfigError(f'Invalid {option} "{value}", expected e.g. "30s"')
+    return value
+
+
+def _count(config: Mapping[str, Any], option: str, default: int, minimum: int = 0) -> int:
+    value = config.get(option, default)
+    if value < minimum:
+        raise InvalidConfigError(f"Invalid {option} {value}, must be at least {minimum}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class HealthCheckConfig:
+    """The settings of the workload alive and ready Pebble checks."""
+
+    period: str = "10s"
+    timeout: str = "3s"
+    threshold: int = 3
+
+    @classmethod
+    def load(cls, config: Mapping[str, Any]) -> "HealthCheckConfig":
+        defaults = cls()
+        health_check = cls(
+            period=_duration(config, "health_check_period", defaults.period),
+            timeout=_duration(config, "health_check_timeout", defaults.timeout),
+            threshold=_count(config, "health_check_threshold", defaults.threshold, minimum=1),
+        )
+        if duration_seconds(health_check.timeout) >= duration_seconds(health_check.period):
+            raise InvalidConfigError(
+                f'Invalid health_check_timeout "{health_check.timeout}", '
+                f'must be lower than health_check_period "{health_check.period}"'
+            )
+        return health_check
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceRequestConfig:
+    """How the workload container resource requests are derived from its limits."""
+
+    ratio: Optional[float] = None
+
+    @classmethod
+    def load(cls, config: Mapping[str, Any]) -> "ResourceRequestConfig":
+        if (value := config.get("resource_request_ratio")) is None:
+            return cls()
+        ratio = float(value)
+        if not 0 < ratio <= 1:
+            raise InvalidConfigError(
+                f"Invalid resource_request_ratio {ratio}, must be greater than 0 and at most 1"
+            )
+        return cls(ratio=ratio)
+
+
+@dataclass(frozen=True, slots=True)
+class GoRuntimeConfig:
+    """The overrides of the workload Go runtime settings, unset by default."""
+
+    gomaxprocs: Optional[int] = None
+    gomemlimit: Optional[str] = None
+
+    @classmethod
+    def load(cls, config: Mapping[str, Any]) -> "GoRuntimeConfig":
+        gomaxprocs, gomemlimit = config.get("gomaxprocs"), config.get("gomemlimit")
+        if gomaxprocs is not None:
+            _count(config, "gomaxprocs", gomaxprocs, minimum=1)
+        if gomemlimit is not None and not GOMEMLIMIT_RE.fullmatch(gomemlimit):
+            raise InvalidConfigError(f'Invalid gomemlimit "{gomemlimit}", expected e.g. "900MiB"')
+        return cls(gomaxprocs=gomaxprocs, gomemlimit=gomemlimit)
@@ -9,8 +9,15 @@ WORKLOAD_CONTAINER_NAME = "login-ui"
 # Application constants
 APPLICATION_NAME = f"identity-platform-{WORKLOAD_CONTAINER_NAME}"
 APPLICATION_PORT = 8080
-WORKLOAD_RUN_COMMAND = f"/usr/bin/{APPLICATION_NAME} serve"
+WORKLOAD_BINARY_PATH = f"/usr/bin/{APPLICATION_NAME}"
+WORKLOAD_RUN_COMMAND = f"{WORKLOAD_BINARY_PATH} serve"
+WORKLOAD_ALIVE_CHECK = f"{WORKLOAD_CONTAINER_NAME}-alive"
+WORKLOAD_READY_CHECK = f"{WORKLOAD_CONTAINER_NAME}-ready"
+WORKLOAD_CHECKS = (WORKLOAD_ALIVE_CHECK, WORKLOAD_READY_CHECK)
+WORKLOAD_STATUS_URL = f"http://localhost:{APPLICATION_PORT}/api/v0/status"
 COOKIES_KEY = "cookies_key"
+# Requests of the workload container resources without an explicit request or ratio
+DEFAULT_RESOURCE_REQUESTS = {"cpu": "100m", "memory": "200Mi"}
 
 # Integrations constants
 PEER_INTEGRATION_NAME = APPLICATION_NAME
@@ -8,3 +8,14 @@ class CharmError(Exception):
 
 class PebbleServiceError(CharmError):
     """Error for pebble related operations."""
+
+
+class RestartLockPendingError(CharmError):
+    """Error for a workload restart waiting for the restart lock."""
+
+
+class InvalidConfigError(CharmError, ValueError):
+    """Error for an invalid charm configuration.
+
+    A ValueError, the only error the resources patch expects from the resource spec.
+    """
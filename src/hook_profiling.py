@@ -0,0 +1,106 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Per-dispatch profiling of the charm."""
+
+import cProfile
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+HOOK_PROFILES_PATH = Path("/var/log/hook-profiles")
+MAX_HOOK_PROFILES = 50
+
+
+class HookProfiler:
+    """Record the cProfile stats and the tracemalloc peak of a dispatch.
+
+    Each dispatch is stored as a `<timestamp>-<hook>.prof` pstats dump with a
+    `.json` summary next to it, only the newest `max_profiles` are kept.
+    """
+
+    def __init__(
+        self,
+        hook: str,
+        path: Path = HOOK_PROFILES_PATH,
+        max_profiles: int = MAX_HOOK_PROFILES,
+    ) -> None:
+        self._hook = hook or "unknown"
+        self._path = path
+        self._max_profiles = max_profiles
+        self._profile = cProfile.Profile()
+        self._started_at: Optional[float] = None
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self._started_at = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling and store the profile of the dispatch."""
+        if self._started_at is None:
+            return
+
+        self._profile.disable()
+        duration = time.perf_counter() - self._started_at
+        _, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._started_at = None
+
+        name = f"{time.time_ns()}-{self._hook}"
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._profile.dump_stats(self._path / f"{name}.prof")
+            (self._path / f"{name}.json").write_text(
+                json.dumps({"hook": self._hook, "duration": duration, "memory_peak": memory_peak})
+            )
+            self._rotate()
+        except OSError as err:
+            logger.warning(f"Failed to store the hook profile: {err}")
+
+    def _rotate(self) -> None:
+        for summary in sorted(self._path.glob("*.json"))[: -self._max_profiles]:
+            summary.with_suffix(".prof").unlink(missing_ok=True)
+            summary.unlink()
+
+
+def summarise_hook_profiles(path: Path = HOOK_PROFILES_PATH, limit: int = 10) -> dict[str, str]:
+    """Summarise the slowest hooks and the hottest functions of the stored profiles."""
+    summaries = sorted(path.glob("*.json")) if path.is_dir() else []
+    summaries = [summary for summary in summaries if summary.with_suffix(".prof").exists()]
+    if not summaries:
+        return {}
+
+    hooks = sorted(
+        (json.loads(summary.read_text()) for summary in summaries),
+        key=lambda hook: hook["duration"],
+        reverse=True,
+    )
+    slowest_hooks = "\n".join(
+        f"{hook['hook']}: {hook['duration'] * 1000:.1f}ms, "
+        f"{hook['memory_peak'] / 1024:.1f}KiB peak"
+        for hook in hooks[:limit]
+    )
+
+    stats = pstats.Stats(*(str(summary.with_suffix(".prof")) for summary in summaries))
+    functions = sorted(
+        stats.stats.items(),  # type: ignore[attr-defined]
+        key=lambda item: item[1][2],
+        reverse=True,
+    )
+    hottest_functions = "\n".join(
+        f"{filename}:{line}({func}): {total_time * 1000:.1f}ms in {calls} calls"
+        for (filename, line, func), (_, calls, total_time, _, _) in functions[:limit]
+    )
+
+    return {
+        "profiles": str(len(summaries)),
+        "slowest-hooks": slowest_hooks,
+        "hottest-functions": hottest_functions,
+    }
@@ -1,12 +1,13 @@
 # Copyright 2025 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-import json
 import logging
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import urlparse
 
+import yaml
 from charms.hydra.v0.hydra_endpoints import (
     HydraEndpointsRelationDataMissingError,
     HydraEndpointsRelationMissingError,
@@ -16,13 +17,73 @@ from charms.kratos.v0.kratos_info import KratosInfoRelationDataMissingError, Kra
 from charms.tempo_k8s.v2.tracing import TracingEndpointRequirer
 from charms.tenant_service.v0.tenant_service_info import TenantServiceInfoRequirer
 from charms.traefik_k8s.v0.traefik_route import TraefikRouteRequirer
-from jinja2 import Template
+from opentelemetry import trace
 from yarl import URL
 
 from constants import APPLICATION_PORT as PUBLIC_PORT
 from constants import PUBLIC_ROUTE_INTEGRATION_NAME
+from utils import normalise_url
 
 logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# (router name suffix, traefik rule, rewrite /self-service to the kratos proxy)
+PUBLIC_ROUTES = (
+    ("self-service", "PathPrefix(`/self-service`)", True),
+    ("api-device", "Path(`/api/device`)", False),
+    ("api-consent", "Path(`/api/consent`)", False),
+    ("api-config", "Path(`/api/v0/app-config`)", False),
+    ("api-tenants-resolve", "Path(`/api/v0/tenants/resolve`)", False),
+    ("api-tenants", "Path(`/api/v0/tenants`)", False),
+    ("api-auth-tenant", "Path(`/api/v0/auth/tenant`)", False),
+    ("ui", "PathPrefix(`/ui`)", False),
+)
+
+
+@lru_cache
+def public_route_config(model: str, app: str, port: int, external_host: str) -> dict:
+    """Build the raw traefik route configuration for the public endpoints.
+
+    The result is cached per configuration, callers must not mutate it.
+    """
+    identifier = f"{model}-{app}"
+    service = f"juju-{identifier}-public-api-service"
+    middleware = f"juju-sidecar-replace-path-regex-{identifier}"
+    tls = {"domains": [{"main": external_host, "sans": [f"*.{external_host}"]}]}
+
+    routers = {}
+    for name, rule, rewrite in PUBLIC_ROUTES:
+        router = f"juju-{identifier}-public-api-router-{name}"
+        middlewares = {"middlewares": [middleware]} if rewrite else {}
+        routers[router] = {"entryPoints": ["web"], "rule": rule, **middlewares, "service": service}
+        routers[f"{router}-tls"] = {
+            "entryPoints": ["websecure"],
+            "rule": rule,
+            **middlewares,
+            "service": service,
+            "tls": tls,
+        }
+
+    return {
+        "http": {
+            "middlewares": {
+                middleware: {
+                    "replacePathRegex": {
+                        "regex": "^/self-service/(.*)",
+                        "replacement": "/api/kratos/self-service/$1",
+                    }
+                }
+            },
+            "routers": routers,
+            "services": {
+                service: {
+                    "loadBalancer": {
+                        "servers": [{"url": f"http://{app}.{model}.svc.cluster.local:{port}"}]
+                    }
+                }
+            },
+        }
+    }
 
 
 @dataclass(frozen=True, slots=True)
@@ -59,7 +120,7 @@ class KratosInfoData:
 
     @classmethod
     def load(cls, requirer: KratosInfoRequirer) -> "KratosInfoData":
-        if not requirer.is_ready():
+        if not (is_ready := requirer.is_ready()):
             return cls()
 
         info = {}
@@ -74,7 +135,7 @@ class KratosInfoData:
             mfa_enabled=info.get("mfa_enabled"),
             oidc_webauthn_sequencing_enabled=info.get("oidc_webauthn_sequencing_enabled"),
             verification_enabled=info.get("verification_enabled"),
-            is_ready=requirer.is_ready(),
+            is_ready=is_ready,
             feature_flags=info.get("feature_flags", None),
         )
 
@@ -101,6 +162,13 @@ class TracingData:
             grpc_endpoint=grpc_endpoint.geturl(),
         )
 
+    @property
+    def charm_traces_url(self) -> Optional[str]:
+        """The OTLP HTTP URL the charm sends its own traces to."""
+        if not self.http_endpoint.startswith(("http://", "https://")):
+            return None
+        return f"{self.http_endpoint.rstrip('/')}/v1/traces"
+
 
 @dataclass(frozen=True, slots=True)
 class PublicRouteData:
@@ -110,54 +178,46 @@ class PublicRouteData:
     config: dict = field(default_factory=dict)
 
     @classmethod
-    def _external_host(cls, requirer: TraefikRouteRequirer) -> str:
+    def _remote_app_data(cls, requirer: TraefikRouteRequirer) -> dict[str, str]:
         if not (relation := requirer._charm.model.get_relation(PUBLIC_ROUTE_INTEGRATION_NAME)):
-            return
-        if not relation.app:
-            return
-        return relation.data[relation.app].get("external_host", "")
-
-    @classmethod
-    def _scheme(cls, requirer: TraefikRouteRequirer) -> str:
-        if not (relation := requirer._charm.model.get_relation(PUBLIC_ROUTE_INTEGRATION_NAME)):
-            return
+            return {}
         if not relation.app:
-            return
-        return relation.data[relation.app].get("scheme", "")
+            return {}
+        return dict(relation.data[relation.app])
 
     @classmethod
+    @tracer.start_as_current_span("PublicRouteData.load")
     def load(cls, requirer: TraefikRouteRequirer) -> "PublicRouteData":
         model, app = requirer._charm.model.name, requirer._charm.app.name
-        external_host = cls._external_host(requirer)
-        scheme = cls._scheme(requirer)
-
-        external_endpoint = f"{scheme}://{external_host}"
-        # template could have use PathPrefixRegexp but going for a simple one right now
-        with open("templates/public-route.json.j2", "r") as file:
-            template = Template(file.read())
-
-        ingress_config = json.loads(
-            template.render(
-                model=model,
-                app=app,
-                public_port=PUBLIC_PORT,
-                external_host=external_host,
-            )
-        )
+        remote_app_data = cls._remote_app_data(requirer)
+        external_host = remote_app_data.get("external_host", "")
+        scheme = remote_app_data.get("scheme", "")
 
         if not external_host:
             logger.error("External hostname is not set on the ingress provider")
             return cls()
 
         return cls(
-            url=URL(external_endpoint),
-            config=ingress_config,
+            url=URL(f"{scheme}://{external_host}"),
+            config=public_route_config(model, app, PUBLIC_PORT, external_host),
         )
 
     @property
     def secured(self) -> bool:
         return self.url.scheme == "https"
 
+    def submit(self, requirer: TraefikRouteRequirer) -> None:
+        """Submit the route config to traefik unless the relation already holds it."""
+        databag = requirer._relation.data[requirer._charm.app]
+        if databag.get("raw") == str(requirer._raw) and databag.get("config") == yaml.safe_dump(
+            self.config
+        ):
+            logger.debug("Public route config is unchanged, skipping the submission")
+            return
+
+        with tracer.start_as_current_span("submit_to_traefik"):
+            requirer.submit_to_traefik(self.config)
+
 
 @dataclass(frozen=True, slots=True)
 class TenantServiceInfoData:
@@ -181,3 +241,39 @@ class TenantServiceInfoData:
             is_ready = parsed.scheme in ("http", "https") and bool(parsed.host)
 
         return cls(service_url=service_url, grpc_url=grpc_url, is_ready=is_ready)
+
+
+@dataclass(frozen=True, slots=True)
+class IntegrationSnapshot:
+    """The integration data read once per dispatch and shared by its consumers."""
+
+    hydra_endpoint: HydraEndpointData = HydraEndpointData()
+    kratos_info: KratosInfoData = KratosInfoData()
+    tracing: TracingData = TracingData()
+    tenant_service_info: TenantServiceInfoData = TenantServiceInfoData()
+    public_route: Optional[PublicRouteData] = None
+
+    @classmethod
+    @tracer.start_as_current_span("IntegrationSnapshot.load")
+    def load(
+        cls,
+        *,
+        hydra_endpoints: HydraEndpointsRequirer,
+        kratos_info: KratosInfoRequirer,
+        tracing: TracingEndpointRequirer,
+        tenant_service_info: TenantServiceInfoRequirer,
+        public_route: TraefikRouteRequirer,
+    ) -> "IntegrationSnapshot":
+        return cls(
+            hydra_endpoint=HydraEndpointData.load(hydra_endpoints),
+            kratos_info=KratosInfoData.load(kratos_info),
+            tracing=TracingData.load(tracing),
+            tenant_service_info=TenantServiceInfoData.load(tenant_service_info),
+            public_route=PublicRouteData.load(public_route) if public_route.is_ready() else None,
+        )
+
+    @property
+    def domain_url(self) -> Optional[str]:
+        if self.public_route is None:
+            return None
+        return normalise_url(str(self.public_route.url))
@@ -0,0 +1,96 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Event-aware reconciliation of the charm state."""
+
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Iterable
+
+from opentelemetry import trace
+
+from constants import (
+    CERTIFICATE_TRANSFER_NAME,
+    HYDRA_INTEGRATION_NAME,
+    KRATOS_INTEGRATION_NAME,
+    PEER_INTEGRATION_NAME,
+    PUBLIC_ROUTE_INTEGRATION_NAME,
+    TENANT_SERVICE_INFO_INTEGRATION_NAME,
+    TRACING_INTEGRATION_NAME,
+)
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+
+class Input(str, Enum):
+    """The inputs a reconcile step can depend on.
+
+    Integration inputs are named after their relation endpoint.
+    """
+
+    CONFIG = "config"
+    WORKLOAD = "workload"
+    PEERS = PEER_INTEGRATION_NAME
+    CERTIFICATES = CERTIFICATE_TRANSFER_NAME
+    PUBLIC_ROUTE = PUBLIC_ROUTE_INTEGRATION_NAME
+    KRATOS = KRATOS_INTEGRATION_NAME
+    HYDRA = HYDRA_INTEGRATION_NAME
+    TRACING = TRACING_INTEGRATION_NAME
+    TENANT_SERVICE = TENANT_SERVICE_INFO_INTEGRATION_NAME
+
+
+ALL_INPUTS = frozenset(Input)
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    """A reconcile step with its declared inputs and the steps it depends on."""
+
+    name: str
+    inputs: frozenset[Input]
+    run: Callable[[], None]
+    after: tuple[str, ...] = field(default_factory=tuple)
+
+
+class Reconciler:
+    """Run the reconcile steps affected by a set of changed inputs.
+
+    A step runs when one of its inputs changed or when a step it depends on
+    ran. Steps are run in the order they were added, a step must be added
+    after the steps it depends on.
+    """
+
+    def __init__(self) -> None:
+        self._steps: dict[str, Step] = {}
+
+    def add_step(
+        self,
+        name: str,
+        inputs: Iterable[Input],
+        run: Callable[[], None],
+        after: Iterable[str] = (),
+    ) -> None:
+        after = tuple(after)
+        if unknown := set(after).difference(self._steps):
+            raise ValueError(f"Step {name} depends on unknown steps: {sorted(unknown)}")
+        self._steps[name] = Step(name=name, inputs=frozenset(inputs), run=run, after=after)
+
+    def plan(self, changed: Iterable[Input]) -> list[str]:
+        """The names of the steps to run for the changed inputs, in order."""
+        changed = frozenset(changed)
+        planned: list[str] = []
+        for step in self._steps.values():
+            if step.inputs & changed or set(step.after).intersection(planned):
+                planned.append(step.name)
+        return planned
+
+    def reconcile(self, changed: Iterable[Input]) -> list[str]:
+        """Run the steps affected by the changed inputs and return their names."""
+        planned = self.plan(changed)
+        logger.debug(f"Running reconcile steps: {planned}")
+        for name in planned:
+            with tracer.start_as_current_span(f"reconcile {name}"):
+                self._steps[name].run()
+        return planned
@@ -0,0 +1,117 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Restart lock shared by the units over the peer relation."""
+
+import json
+import logging
+from typing import Callable, Optional
+
+from ops import CharmBase, EventBase, Object, Relation, StoredState
+
+logger = logging.getLogger(__name__)
+
+RESTART_REQUEST_KEY = "restart"
+RESTART_GRANTED_KEY = "restart-granted"
+
+
+class RestartLock(Object):
+    """Let at most `max_holders` units restart their workload at once.
+
+    A unit requests the lock in its peer databag, the leader grants it in the
+    application databag to the requesting units, and the unit releases it by
+    withdrawing its request once its workload is back, or once it no longer
+    needs to restart. The grants of the units that left are dropped.
+    """
+
+    _stored = StoredState()
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        relation_name: str,
+        max_holders: Callable[[], int],
+    ) -> None:
+        super().__init__(charm, relation_name)
+        self._charm = charm
+        self._relation_name = relation_name
+        self._max_holders = max_holders
+
+        self._stored.set_default(held=False, requested=False)
+
+        self.framework.observe(charm.on[relation_name].relation_changed, self._on_lock_changed)
+        self.framework.observe(charm.on[relation_name].relation_departed, self._on_lock_changed)
+        self.framework.observe(charm.on.leader_elected, self._on_lock_changed)
+
+    @property
+    def _relation(self) -> Optional[Relation]:
+        return self.model.get_relation(self._relation_name)
+
+    @property
+    def held(self) -> bool:
+        """Whether this unit holds the lock, without reading the relation."""
+        return self._stored.held
+
+    def acquire(self) -> bool:
+        """Request the lock, return whether this unit holds it."""
+        if not (relation := self._relation):
+            return True
+
+        databag = relation.data[self._charm.unit]
+        if databag.get(RESTART_REQUEST_KEY) != "requested":
+            databag[RESTART_REQUEST_KEY] = "requested"
+        self._stored.requested = True
+        if self._charm.unit.is_leader():
+            self._grant(relation)
+
+        granted = json.loads(relation.data[self._charm.app].get(RESTART_GRANTED_KEY, "[]"))
+        self._stored.held = self._charm.unit.name in granted
+        if not self._stored.held:
+            logger.info("Waiting for the restart lock")
+        return self._stored.held
+
+    def release(self) -> None:
+        """Withdraw the lock request, letting the next unit restart."""
+        if not (self._stored.requested or self._stored.held):
+            return
+
+        self._stored.held = self._stored.requested = False
+        if not (relation := self._relation):
+            return
+
+        databag = relation.data[self._charm.unit]
+        if RESTART_REQUEST_KEY not in databag:
+            return
+        del databag[RESTART_REQUEST_KEY]
+        if self._charm.unit.is_leader():
+            self._grant(relation)
+
+    def _on_lock_changed(self, event: EventBase) -> None:
+        if self._charm.unit.is_leader() and (relation := self._relation):
+            self._grant(relation)
+
+    def _grant(self, relation: Relation) -> None:
+        """Grant the lock to the requesting units, up to the maximum holders.
+
+        Only the units still in the relation request it, the grants of the
+        departed units are dropped.
+        """
+        requesting = sorted(
+            unit.name
+            for unit in relation.units | {self._charm.unit}
+            if relation.data[unit].get(RESTART_REQUEST_KEY) == "requested"
+        )
+        databag = relation.data[self._charm.app]
+        granted = [
+            unit
+            for unit in json.loads(databag.get(RESTART_GRANTED_KEY, "[]"))
+            if unit in requesting
+        ]
+        for unit in requesting:
+            if len(granted) >= max(self._max_holders(), 1):
+                break
+            if unit not in granted:
+                granted.append(unit)
+
+        if json.dumps(granted) != databag.get(RESTART_GRANTED_KEY, "[]"):
+            databag[RESTART_GRANTED_KEY] = json.dumps(granted)
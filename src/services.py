@@ -1,20 +1,76 @@
 # Copyright 2025 Canonical Ltd.
 # See LICENSE file for licensing details.
 
+import hashlib
+import json
+import logging
 import re
+from typing import Any, Callable, Mapping
 
-from ops import Container, Unit
-from ops.pebble import Error, Layer, LayerDict
+from opentelemetry import trace
+from ops import Container, ModelError, Unit
+from ops.pebble import Check, CheckStatus, Error, Layer, LayerDict, Service
 
+from configs import (
+    GO_DURATION_RE,
+    HealthCheckConfig,
+    duration_seconds,
+)
 from constants import (
     APPLICATION_NAME,
     APPLICATION_PORT,
+    WORKLOAD_ALIVE_CHECK,
+    WORKLOAD_BINARY_PATH,
+    WORKLOAD_CHECKS,
     WORKLOAD_CONTAINER_NAME,
+    WORKLOAD_READY_CHECK,
     WORKLOAD_RUN_COMMAND,
+    WORKLOAD_STATUS_URL,
 )
-from exceptions import PebbleServiceError
+from exceptions import PebbleServiceError, RestartLockPendingError
 from integrations import HydraEndpointData, KratosInfoData, TenantServiceInfoData, TracingData
 
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+
+def _normalise_environment(environment: dict[str, Any]) -> dict[str, str]:
+    """Convert environment values to the strings Pebble stores in its plan."""
+    normalised = {}
+    for key, value in environment.items():
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif value is None:
+            value = ""
+        normalised[key] = str(value)
+    return normalised
+
+
+def _normalise_check(check: Check) -> dict[str, Any]:
+    """Convert the check durations to seconds, Pebble stores "1m" as "1m0s"."""
+    normalised: dict[str, Any] = dict(check.to_dict())
+    for key in ("period", "timeout"):
+        if isinstance(value := normalised.get(key), str) and GO_DURATION_RE.fullmatch(value):
+            normalised[key] = duration_seconds(value)
+    return normalised
+
+
+def _plan_digest(services: Mapping[str, Service], checks: Mapping[str, Check]) -> str:
+    """Digest the services and checks as Pebble stores them in its plan."""
+    normalised = {
+        "services": {
+            name: {**service.to_dict(), "environment": _normalise_environment(service.environment)}
+            for name, service in services.items()
+        },
+        "checks": {name: _normalise_check(check) for name, check in checks.items()},
+    }
+    return hashlib.sha256(json.dumps(normalised, sort_keys=True).encode()).hexdigest()
+
+
+def layer_digest(layer: Layer) -> str:
+    """The digest the container's plan has once the layer is applied."""
+    return _plan_digest(layer.services, layer.checks)
+
 
 class WorkloadService:
     """Workload service abstraction running in a Juju unit."""
@@ -41,9 +97,20 @@ class WorkloadService:
 
         return ""
 
-    def set_version(self) -> None:
+    @property
+    def binary_fingerprint(self) -> str:
+        """Identify the workload binary by its size and modification time."""
+        try:
+            info = self._container.list_files(WORKLOAD_BINARY_PATH, itself=True)[0]
+        except (Error, IndexError):
+            return ""
+
+        return f"{info.size}:{info.last_modified.isoformat()}"
+
+    def set_version(self) -> str:
         if version := self.version:
             self._unit.set_workload_version(version)
+        return version
 
     def open_port(self) -> None:
         self._unit.open_port(protocol="tcp", port=APPLICATION_PORT)
@@ -65,6 +132,7 @@ class PebbleService:
     def can_connect(self) -> bool:
         return self._container.can_connect()
 
+    @tracer.start_as_current_span("PebbleService.render_pebble_layer")
     def render_pebble_layer(
         self,
         domain_url: str,
@@ -75,12 +143,16 @@ class PebbleService:
         kratos_info: KratosInfoData,
         tracing_data: TracingData,
         tenant_service_info: TenantServiceInfoData | None = None,
+        health_check: HealthCheckConfig | None = None,
+        go_runtime: Mapping[str, str] | None = None,
     ) -> Layer:
-        container = {
+        container: dict[str, Any] = {
             "override": "replace",
             "summary": "identity platform login ui",
             "command": WORKLOAD_RUN_COMMAND,
             "startup": "disabled",
+            # Pebble restarts the workload itself once it fails its alive check
+            "on-check-failure": {WORKLOAD_ALIVE_CHECK: "restart"},
             "environment": {
                 "HYDRA_ADMIN_URL": hydra_endpoint.admin_endpoint,
                 "KRATOS_PUBLIC_URL": kratos_info.public_endpoint,
@@ -97,6 +169,11 @@ class PebbleService:
             },
         }
 
+        health_check = health_check or HealthCheckConfig()
+
+        if go_runtime:
+            container["environment"].update(go_runtime)
+
         if kratos_info.feature_flags:
             container["environment"]["FEATURE_FLAGS"] = kratos_info.feature_flags
 
@@ -122,19 +199,86 @@ class PebbleService:
             "description": "pebble config layer for identity platform login ui",
             "services": {WORKLOAD_CONTAINER_NAME: container},
             "checks": {
-                "login-ui-alive": {
+                name: {
                     "override": "replace",
-                    "http": {"url": f"http://localhost:{APPLICATION_PORT}/api/v0/status"},
-                },
+                    "level": level,
+                    "period": health_check.period,
+                    "timeout": health_check.timeout,
+                    "threshold": health_check.threshold,
+                    "http": {"url": WORKLOAD_STATUS_URL},
+                }
+                for name, level in (
+                    (WORKLOAD_ALIVE_CHECK, "alive"),
+                    (WORKLOAD_READY_CHECK, "ready"),
+                )
             },
         }
 
         return Layer(pebble_layer)
 
-    def plan(self, layer: Layer) -> None:
+    def current_plan_digest(self) -> str:
+        """The digest of the services and checks in the container's current plan."""
+        plan = self._container.get_plan()
+        return _plan_digest(plan.services, plan.checks)
+
+    def is_running(self) -> bool:
+        try:
+            return self._container.get_service(WORKLOAD_CONTAINER_NAME).is_running()
+        except ModelError:
+            return False
+
+    def _check_passed(self, name: str) -> bool:
+        """Whether the check succeeded since it was last started."""
+        try:
+            checks = self._container.get_checks(name)
+        except (Error, ModelError):
+            return False
+
+        if not (check := checks.get(name)):
+            return False
+        # Pebble versions not counting the successes only report the status
+        return check.status == CheckStatus.UP and check.successes != 0
+
+    def is_alive(self) -> bool:
+        return self._check_passed(WORKLOAD_ALIVE_CHECK)
+
+    def is_ready(self) -> bool:
+        """Whether the workload answered its ready check since it was last started."""
+        return self._check_passed(WORKLOAD_READY_CHECK)
+
+    @tracer.start_as_current_span("PebbleService.plan")
+    def plan(
+        self,
+        layer: Layer,
+        can_restart: Callable[[], bool] = lambda: True,
+    ) -> bool:
+        """Apply the layer and restart the workload, return whether it was restarted.
+
+        A running workload is only restarted once `can_restart` allows it, its
+        checks are then started over.
+        """
+        running = False
+        try:
+            if running := self.is_running():
+                plan = self._container.get_plan()
+                if _plan_digest(plan.services, plan.checks) == layer_digest(layer):
+                    logger.info("Pebble plan is up to date, skipping replan")
+                    return False
+        except (Error, ModelError) as e:
+            logger.warning(f"Failed to compare the Pebble plan, replanning. Error: {e}")
+
+        if running and not can_restart():
+            raise RestartLockPendingError("Waiting for the restart lock to restart the workload")
+
+        logger.info("Pebble plan updated with new configuration, replanning")
         self._container.add_layer(WORKLOAD_CONTAINER_NAME, layer, combine=True)
 
         try:
             self._restart_service()
+            if running:
+                self._container.stop_checks(*WORKLOAD_CHECKS)
+                self._container.start_checks(*WORKLOAD_CHECKS)
         except Exception as e:
             raise PebbleServiceError(f"Pebble failed to restart the workload service. Error: {e}")
+
+        return True
@@ -4,14 +4,38 @@
 
 """Utility functions for the login UI charm."""
 
+import math
+import os
+import re
+from decimal import Decimal, InvalidOperation
 from functools import wraps
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, Iterable, Optional, TypeVar
 from urllib.parse import urlparse, urlunparse
 
 from ops.charm import CharmBase
 
 CharmEventHandler = TypeVar("CharmEventHandler", bound=Callable[..., Any])
 
+RELATION_HOOK_KINDS = (
+    "relation-created",
+    "relation-joined",
+    "relation-changed",
+    "relation-departed",
+    "relation-broken",
+)
+
+QUANTITY_RE = re.compile(
+    r"(?P<number>[0-9.]+(?:[eE][+-]?[0-9]+)?)(?P<suffix>[KMGTPE]i|[mkMGTPE])?"
+)
+QUANTITY_SUFFIXES = {
+    "m": Decimal("0.001"),
+    **{suffix: Decimal(1000) ** power for power, suffix in enumerate("kMGTPE", start=1)},
+    **{f"{suffix}i": Decimal(1024) ** power for power, suffix in enumerate("KMGTPE", start=1)},
+}
+# Share of the memory limit the Go garbage collector targets, leaving headroom
+# for the memory the Go runtime does not account for
+GOMEMLIMIT_RATIO = Decimal("0.9")
+
 
 def normalise_url(url: str) -> str:
     """Convert a URL to a more user friendly HTTPS URL.
@@ -53,3 +77,64 @@ def leader_unit(func: CharmEventHandler) -> CharmEventHandler:
         return func(charm, *args, **kwargs)
 
     return wrapper  # type: ignore[return-value]
+
+
+def dispatched_hook() -> str:
+    """The name of the hook being dispatched, empty if it is unknown."""
+    return os.environ.get("JUJU_DISPATCH_PATH", "").rpartition("/")[2]
+
+
+def relation_hooks(relation_name: str) -> frozenset[str]:
+    """The names of the hooks Juju dispatches for a relation endpoint."""
+    return frozenset(f"{relation_name}-{kind}" for kind in RELATION_HOOK_KINDS)
+
+
+def observes_dispatch(hooks: Iterable[str]) -> bool:
+    """Whether any of the hooks is being dispatched.
+
+    An object observing only these hooks does not need to be built otherwise.
+    When the dispatched hook is unknown, assume it is observed.
+    """
+    hook = dispatched_hook()
+    return not hook or hook in set(hooks)
+
+
+def parse_quantity(quantity: Optional[str]) -> Optional[Decimal]:
+    """Parse a Kubernetes resource quantity, such as "500m" or "1Gi", None if invalid."""
+    if not quantity or not (match := QUANTITY_RE.fullmatch(quantity.strip())):
+        return None
+
+    try:
+        number = Decimal(match["number"])
+    except InvalidOperation:
+        return None
+    return number * QUANTITY_SUFFIXES.get(match["suffix"], Decimal(1))
+
+
+def go_runtime_environment(
+    cpu: Optional[str],
+    memory: Optional[str],
+    gomaxprocs: Optional[int] = None,
+    gomemlimit: Optional[str] = None,
+) -> dict[str, str]:
+    """The Go runtime settings matching the container resource limits.
+
+    GOMAXPROCS is the whole number of cores of the cpu limit, so that the
+    workload is not throttled, and GOMEMLIMIT a share of the memory limit,
+    so that the garbage collector runs before the container is OOM killed.
+    The given overrides take precedence, an unset limit leaves the Go
+    runtime default.
+    """
+    environment = {}
+
+    if gomaxprocs:
+        environment["GOMAXPROCS"] = str(gomaxprocs)
+    elif cores := parse_quantity(cpu):
+        environment["GOMAXPROCS"] = str(max(math.floor(cores), 1))
+
+    if gomemlimit:
+        environment["GOMEMLIMIT"] = gomemlimit
+    elif limit := parse_quantity(memory):
+        environment["GOMEMLIMIT"] = str(math.floor(limit * GOMEMLIMIT_RATIO))
+
+    return environment
@@ -0,0 +1,163 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark test configuration, sharing the unit test fixtures."""
+
+import base64
+from dataclasses import replace
+from typing import Any, Callable
+
+import ops.testing
+import pytest
+from unit.conftest import (  # noqa: F401
+    certificate_transfer_relation,
+    context,
+    hydra_relation,
+    kratos_relation,
+    mocked_k8s_resource_patch,
+    patch_certificate_transfer_integration_file_open,
+    peer_relation,
+    public_route_relation,
+    tempo_relation,
+    tenant_service_relation,
+)
+from unit.test_hook_tool_budget import all_relations  # noqa: F401
+
+from constants import WORKLOAD_CONTAINER_NAME, WORKLOAD_READY_CHECK
+
+EventFactory = Callable[[ops.testing.Context, ops.testing.State], Any]
+
+CA_CERTIFICATES = 50
+UI_ENDPOINT_REQUIRERS = 20
+
+
+def _relation(endpoint: str) -> Callable[[ops.testing.State], ops.testing.RelationBase]:
+    return lambda state: state.get_relations(endpoint)[0]
+
+
+def _ready_check(state: ops.testing.State) -> ops.testing.CheckInfo:
+    container = state.get_container(WORKLOAD_CONTAINER_NAME)
+    return next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+
+
+# The events observed by the charm and the libraries it instantiates
+EVENTS: dict[str, EventFactory] = {
+    "login-ui-pebble-ready": lambda ctx, state: ctx.on.pebble_ready(
+        state.get_container(WORKLOAD_CONTAINER_NAME)
+    ),
+    "config-changed": lambda ctx, state: ctx.on.config_changed(),
+    "update-status": lambda ctx, state: ctx.on.update_status(),
+    "login-ui-pebble-check-failed": lambda ctx, state: ctx.on.pebble_check_failed(
+        state.get_container(WORKLOAD_CONTAINER_NAME), _ready_check(state)
+    ),
+    "login-ui-pebble-check-recovered": lambda ctx, state: ctx.on.pebble_check_recovered(
+        state.get_container(WORKLOAD_CONTAINER_NAME), _ready_check(state)
+    ),
+    "leader-elected": lambda ctx, state: ctx.on.leader_elected(),
+    "upgrade-charm": lambda ctx, state: ctx.on.upgrade_charm(),
+    "identity-platform-login-ui-relation-created": lambda ctx, state: ctx.on.relation_created(
+        _relation("identity-platform-login-ui")(state)
+    ),
+    "identity-platform-login-ui-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("identity-platform-login-ui")(state), remote_unit=1
+    ),
+    "kratos-info-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("kratos-info")(state)
+    ),
+    "hydra-endpoint-info-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("hydra-endpoint-info")(state)
+    ),
+    "tenant-service-info-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("tenant-service-info")(state)
+    ),
+    "tenant-service-info-relation-broken": lambda ctx, state: ctx.on.relation_broken(
+        _relation("tenant-service-info")(state)
+    ),
+    "tracing-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("tracing")(state)
+    ),
+    "tracing-relation-broken": lambda ctx, state: ctx.on.relation_broken(
+        _relation("tracing")(state)
+    ),
+    "public-route-relation-joined": lambda ctx, state: ctx.on.relation_joined(
+        _relation("public-route")(state)
+    ),
+    "public-route-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("public-route")(state)
+    ),
+    "public-route-relation-broken": lambda ctx, state: ctx.on.relation_broken(
+        _relation("public-route")(state)
+    ),
+    "receive-ca-cert-relation-changed": lambda ctx, state: ctx.on.relation_changed(
+        _relation("receive-ca-cert")(state), remote_unit=0
+    ),
+    "receive-ca-cert-relation-broken": lambda ctx, state: ctx.on.relation_broken(
+        _relation("receive-ca-cert")(state)
+    ),
+    "ui-endpoint-info-relation-created": lambda ctx, state: ctx.on.relation_created(
+        _relation("ui-endpoint-info")(state)
+    ),
+    "metrics-endpoint-relation-joined": lambda ctx, state: ctx.on.relation_joined(
+        _relation("metrics-endpoint")(state)
+    ),
+    "logging-relation-joined": lambda ctx, state: ctx.on.relation_joined(
+        _relation("logging")(state)
+    ),
+    "grafana-dashboard-relation-created": lambda ctx, state: ctx.on.relation_created(
+        _relation("grafana-dashboard")(state)
+    ),
+}
+
+
+@pytest.fixture
+def populated_relations(
+    all_relations: list[ops.testing.RelationBase],  # noqa: F811
+    peer_relation: ops.testing.PeerRelation,  # noqa: F811
+    certificate_transfer_relation: ops.testing.Relation,  # noqa: F811
+) -> list[ops.testing.RelationBase]:
+    """Every integration of the charm, populated like a production model."""
+    peers = replace(peer_relation, peers_data={1: {}, 2: {}})
+    ca_certificates = replace(
+        certificate_transfer_relation,
+        remote_units_data={
+            unit: {
+                "ca": "-----BEGIN CERTIFICATE-----\n"
+                f"{base64.b64encode(f'ca-certificate-{unit}'.encode()).decode()}\n"
+                "-----END CERTIFICATE-----"
+            }
+            for unit in range(CA_CERTIFICATES)
+        },
+    )
+    ui_endpoint_requirers = [
+        ops.testing.Relation(
+            endpoint="ui-endpoint-info",
+            interface="login_ui_endpoints",
+            remote_app_name=f"requirer-{i}",
+        )
+        for i in range(UI_ENDPOINT_REQUIRERS)
+    ]
+    observability = [
+        ops.testing.Relation(
+            endpoint="metrics-endpoint",
+            interface="prometheus_scrape",
+            remote_app_name="prometheus",
+        ),
+        ops.testing.Relation(
+            endpoint="logging", interface="loki_push_api", remote_app_name="loki"
+        ),
+        ops.testing.Relation(
+            endpoint="grafana-dashboard", interface="grafana_dashboard", remote_app_name="grafana"
+        ),
+    ]
+    return [
+        *(
+            relation
+            for relation in all_relations
+            if relation.endpoint
+            not in (peer_relation.endpoint, certificate_transfer_relation.endpoint)
+        ),
+        peers,
+        ca_certificates,
+        *ui_endpoint_requirers,
+        *observability,
+    ]
@@ -0,0 +1,76 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Import time and dispatch latency budgets of the charm.
+
+Python startup and the charm imports are paid by every hook, so these budgets
+guard the hook latency against regressions, e.g. when a library is bumped.
+The budgets are in milliseconds and can be overridden through the environment
+for slower machines.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import ops.testing
+import pytest
+from unit.conftest import create_state, started_state
+from unit.test_hook_tool_budget import STARTED_WORKLOAD_CHECKS
+
+from .conftest import EVENTS
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("CHARM_IMPORT_TIME_BUDGET_MS", "1000"))
+DISPATCH_TIME_BUDGET_MS = float(os.getenv("CHARM_DISPATCH_TIME_BUDGET_MS", "200"))
+ROUNDS = int(os.getenv("CHARM_BENCHMARK_ROUNDS", "5"))
+
+PROJECT_PATH = Path(__file__).parents[2]
+# `python -X importtime` reports `import time: <self us> | <cumulative us> | <module>`
+CHARM_IMPORT_TIME_RE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| charm$", re.MULTILINE)
+
+
+def cold_import_time_ms() -> float:
+    """The cumulative time to import the charm module in a new interpreter."""
+    python_path = [PROJECT_PATH, PROJECT_PATH / "lib", PROJECT_PATH / "src"]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import charm"],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(map(str, python_path))},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = CHARM_IMPORT_TIME_RE.search(result.stderr)
+    assert match, "The charm module import time was not reported"
+    return int(match[1]) / 1000
+
+
+def test_charm_import_time_budget() -> None:
+    import_time = statistics.median(cold_import_time_ms() for _ in range(ROUNDS))
+
+    print(f"charm import time: {import_time:.1f}ms")
+    assert import_time <= IMPORT_TIME_BUDGET_MS
+
+
+@pytest.mark.parametrize("event_name", EVENTS)
+def test_dispatch_time_budget(
+    context: ops.testing.Context,
+    populated_relations: list[ops.testing.RelationBase],
+    event_name: str,
+) -> None:
+    state_in = create_state(relations=populated_relations)
+    if (checks := STARTED_WORKLOAD_CHECKS.get(event_name)) is not None:
+        state_in = started_state(context, state_in, **checks)
+
+    dispatch_times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        context.run(EVENTS[event_name](context, state_in), state_in)
+        dispatch_times.append((time.perf_counter() - start) * 1000)
+    dispatch_time = statistics.median(dispatch_times)
+
+    print(f"{event_name} dispatch time: {dispatch_time:.1f}ms")
+    assert dispatch_time <= DISPATCH_TIME_BUDGET_MS
@@ -0,0 +1,54 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Latency and allocations of every event handled by the charm.
+
+Each event is dispatched against a state with every integration populated,
+the reported p50/p95 latencies and allocation peaks are the baseline the
+charm optimisations are measured against. Run with `tox -e benchmark`.
+"""
+
+import math
+import os
+import tracemalloc
+
+import ops.testing
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+from unit.conftest import create_state, started_state
+from unit.test_hook_tool_budget import STARTED_WORKLOAD_CHECKS
+
+from .conftest import EVENTS
+
+ROUNDS = int(os.getenv("CHARM_BENCHMARK_ROUNDS", "20"))
+
+
+def _percentile(sorted_data: list[float], percentile: float) -> float:
+    """The nearest-rank percentile of sorted data."""
+    return sorted_data[max(math.ceil(percentile / 100 * len(sorted_data)) - 1, 0)]
+
+
+@pytest.mark.parametrize("event_name", EVENTS)
+def test_hook_latency(
+    benchmark: BenchmarkFixture,
+    context: ops.testing.Context,
+    populated_relations: list[ops.testing.RelationBase],
+    event_name: str,
+) -> None:
+    state_in = create_state(relations=populated_relations)
+    if (checks := STARTED_WORKLOAD_CHECKS.get(event_name)) is not None:
+        state_in = started_state(context, state_in, **checks)
+    event = EVENTS[event_name](context, state_in)
+
+    tracemalloc.start()
+    context.run(event, state_in)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark.pedantic(context.run, args=(event, state_in), rounds=ROUNDS, warmup_rounds=1)
+
+    benchmark.extra_info["peak_allocated_kib"] = round(peak / 1024, 1)
+    if benchmark.stats:
+        sorted_data = benchmark.stats.stats.sorted_data
+        benchmark.extra_info["p50_ms"] = round(_percentile(sorted_data, 50) * 1000, 2)
+        benchmark.extra_info["p95_ms"] = round(_percentile(sorted_data, 95) * 1000, 2)
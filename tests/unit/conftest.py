@@ -3,31 +3,98 @@
 
 """Unit test configuration."""
 
+import functools
+import inspect
 import json
+import weakref
+from collections import Counter
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable
 from unittest.mock import mock_open, patch
 
 import ops.testing
 import pytest
+from ops import pebble
 from pytest_mock import MockerFixture
+from scenario.mocking import _MockModelBackend, _MockPebbleClient
 
 from charm import IdentityPlatformLoginUiOperatorCharm
-from constants import WORKLOAD_CONTAINER_NAME
+from constants import WORKLOAD_BINARY_PATH, WORKLOAD_CONTAINER_NAME
 
 
 @pytest.fixture(autouse=True)
 def mocked_k8s_resource_patch(mocker: MockerFixture) -> None:
-    mocker.patch(
+    from charms.observability_libs.v0.kubernetes_compute_resources_patch import ResourcePatcher
+
+    patcher = mocker.patch(
         "charms.observability_libs.v0.kubernetes_compute_resources_patch.ResourcePatcher",
         autospec=True,
-    )
+    ).return_value
+    # Validate the resource requirements for real, only the K8s API calls are mocked
+    patcher.is_failed.side_effect = functools.partial(ResourcePatcher.is_failed, patcher)
+    patcher.is_in_progress.return_value = False
     mocker.patch.multiple(
-        "charm.KubernetesComputeResourcesPatch",
+        "charms.observability_libs.v0.kubernetes_compute_resources_patch.KubernetesComputeResourcesPatch",
         _namespace="testing",
         _patch=lambda *a, **kw: True,
         is_ready=lambda *a, **kw: True,
     )
 
 
+# Hook tools counted by `hook_tool_calls`, keyed by the model backend method running them
+HOOK_TOOLS = {
+    "relation_get": "relation-get",
+    "relation_set": "relation-set",
+    "relation_ids": "relation-ids",
+    "relation_list": "relation-list",
+    "is_leader": "is-leader",
+    "config_get": "config-get",
+    "open_port": "open-port",
+    "status_set": "status-set",
+}
+# Under Juju, ops caches these for the duration of a hook, only the first call runs the tool
+CACHED_HOOK_TOOLS = {"is-leader"}
+PEBBLE_API = sorted(
+    name
+    for name, _ in inspect.getmembers(pebble.Client, inspect.isfunction)
+    if not name.startswith("_")
+)
+
+
+@pytest.fixture
+def hook_tool_calls(monkeypatch: pytest.MonkeyPatch) -> Counter:
+    """Count the hook tool and Pebble API calls made while running the charm.
+
+    Scenario offers no public hook for these calls, so its private mock backend
+    and Pebble client are patched. ops-scenario is pinned in unit-requirements.txt
+    for that reason, check this fixture still counts the calls when bumping it.
+    """
+    calls: Counter = Counter()
+    cached: dict[str, weakref.WeakSet] = {name: weakref.WeakSet() for name in CACHED_HOOK_TOOLS}
+
+    def counting(name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if name not in cached or self not in cached[name]:
+                calls[name] += 1
+                cached.get(name, set()).add(self)
+            return func(self, *args, **kwargs)
+
+        return wrapper
+
+    for method, tool in HOOK_TOOLS.items():
+        monkeypatch.setattr(
+            _MockModelBackend, method, counting(tool, getattr(_MockModelBackend, method))
+        )
+    for method in PEBBLE_API:
+        monkeypatch.setattr(
+            _MockPebbleClient, method, counting("pebble", getattr(_MockPebbleClient, method))
+        )
+
+    return calls
+
+
 @pytest.fixture
 def context() -> ops.testing.Context:
     """Initialize context with Charm."""
@@ -50,6 +117,23 @@ def container_can_connect() -> ops.testing.Container:
     )
 
 
+@pytest.fixture
+def container_with_binary(
+    container_can_connect: ops.testing.Container, tmp_path: Path
+) -> ops.testing.Container:
+    """Workload container shipping the workload binary."""
+    binary = tmp_path / Path(WORKLOAD_BINARY_PATH).name
+    binary.write_text("binary")
+    return replace(
+        container_can_connect,
+        mounts={
+            "bin": ops.testing.Mount(
+                location=str(Path(WORKLOAD_BINARY_PATH).parent), source=tmp_path
+            )
+        },
+    )
+
+
 @pytest.fixture
 def container_cannot_connect() -> ops.testing.Container:
     """Workload container in non-connectable state."""
@@ -96,6 +180,23 @@ def create_state(
     )
 
 
+def started_state(
+    context: ops.testing.Context, state: ops.testing.State, **check_changes: dict[str, Any]
+) -> ops.testing.State:
+    """The state once the workload started, with changes to its Pebble checks by name."""
+    state = context.run(
+        context.on.pebble_ready(state.get_container(WORKLOAD_CONTAINER_NAME)), state
+    )
+    container = state.get_container(WORKLOAD_CONTAINER_NAME)
+    container = replace(
+        container,
+        check_infos={
+            replace(info, **check_changes.get(info.name, {})) for info in container.check_infos
+        },
+    )
+    return replace(state, containers=[container])
+
+
 @pytest.fixture(autouse=True)
 def patch_certificate_transfer_integration_file_open():
     with patch(
@@ -183,3 +284,29 @@ def tenant_service_relation() -> ops.testing.Relation:
             "grpc_url": "grpc://tenant-service:50051",
         },
     )
+
+
+@pytest.fixture
+def certificate_transfer_relation() -> ops.testing.Relation:
+    return ops.testing.Relation(
+        endpoint="receive-ca-cert",
+        interface="certificate_transfer",
+        remote_app_name="self-signed-certificates",
+        remote_units_data={
+            0: {
+                "ca": "-----BEGIN CERTIFICATE-----\nY2EtY2VydGlmaWNhdGU=\n-----END CERTIFICATE-----"
+            },
+            1: {
+                "ca": "-----BEGIN CERTIFICATE-----\nY2EtY2VydGlmaWNh\ndGU=\n-----END CERTIFICATE-----"
+            },
+        },
+    )
+
+
+@pytest.fixture
+def login_ui_endpoints_relation() -> ops.testing.Relation:
+    return ops.testing.Relation(
+        endpoint="ui-endpoint-info",
+        interface="login_ui_endpoints",
+        remote_app_name="hydra",
+    )
@@ -3,15 +3,37 @@
 
 """Test functions for unit testing Identity Platform Login UI Operator."""
 
-from unittest.mock import patch
+import json
+from collections import Counter
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+from unittest.mock import mock_open, patch
 
 import ops.testing
-from ops import ActiveStatus, BlockedStatus, WaitingStatus
-
-from constants import COOKIES_KEY, WORKLOAD_CONTAINER_NAME, WORKLOAD_RUN_COMMAND
+import pytest
+import yaml
+from charms.kratos.v0.kratos_info import KratosInfoRequirer
+from charms.traefik_k8s.v0.traefik_route import TraefikRouteRequirer
+from ops import ActiveStatus, BlockedStatus, Container, WaitingStatus
+from ops.pebble import CheckStatus, Layer, ServiceStatus
+from pytest_mock import MockerFixture
+
+from certificate_transfer_integration import BUNDLE_PATH, parse_certificates
+from constants import (
+    COOKIES_KEY,
+    WORKLOAD_ALIVE_CHECK,
+    WORKLOAD_BINARY_PATH,
+    WORKLOAD_CONTAINER_NAME,
+    WORKLOAD_READY_CHECK,
+    WORKLOAD_RUN_COMMAND,
+)
 from exceptions import PebbleServiceError
+from integrations import IntegrationSnapshot
+from restart_lock import RESTART_GRANTED_KEY, RESTART_REQUEST_KEY
+from services import PebbleService
 
-from .conftest import create_state
+from .conftest import create_state, started_state
 
 
 class TestPebbleReadyEvent:
@@ -79,6 +101,40 @@ class TestPebbleReadyEvent:
 
         assert len(peer_rel.local_app_data[COOKIES_KEY]) == 32
 
+    def test_pebble_ready_workload_version_cached(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        container_with_binary: ops.testing.Container,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(container=container_with_binary, relations=[peer_relation])
+        state_in = context.run(context.on.pebble_ready(container_with_binary), state_in)
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        exec_ = mocker.spy(Container, "exec")
+
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+
+        exec_.assert_not_called()
+        assert state_out.workload_version == "1.42.0"
+
+    def test_pebble_ready_workload_version_refreshed_on_binary_change(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        container_with_binary: ops.testing.Container,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(container=container_with_binary, relations=[peer_relation])
+        state_in = context.run(context.on.pebble_ready(container_with_binary), state_in)
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        (container.mounts["bin"].source / Path(WORKLOAD_BINARY_PATH).name).write_text("new binary")
+        exec_ = mocker.spy(Container, "exec")
+
+        context.run(context.on.pebble_ready(container), state_in)
+
+        exec_.assert_called_once()
+
 
 class TestConfigChangedEvent:
     """Tests for config-changed event handling."""
@@ -92,6 +148,20 @@ class TestConfigChangedEvent:
         state_out = context.run(context.on.config_changed(), state_in)
         assert state_out.unit_status == ActiveStatus()
 
+    def test_config_changed_builds_resources_patch(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+
+        with context(context.on.config_changed(), state_in) as mgr:
+            mgr.run()
+            charm = mgr.charm
+
+        assert charm.resources_patch is not None
+        assert charm.metrics_endpoint is None
+
     def test_config_changed_cannot_connect(
         self,
         context: ops.testing.Context,
@@ -102,6 +172,240 @@ class TestConfigChangedEvent:
         state_out = context.run(context.on.config_changed(), state_in)
         assert state_out.unit_status == WaitingStatus("Waiting to connect to Login_UI container")
 
+    @pytest.mark.parametrize(
+        "config, expected_limits, expected_requests",
+        [
+            ({}, {}, {"cpu": "100m", "memory": "200Mi"}),
+            (
+                {"cpu": "1", "memory": "1Gi", "cpu_request": "500m", "memory_request": "512Mi"},
+                {"cpu": "1", "memory": "1073741824"},
+                {"cpu": "500m", "memory": "512Mi"},
+            ),
+            (
+                {"cpu": "2", "memory": "1Gi", "resource_request_ratio": 0.5},
+                {"cpu": "2", "memory": "1073741824"},
+                {"cpu": "1000m", "memory": "536870912"},
+            ),
+            (
+                {"cpu": "2", "memory": "1Gi", "resource_request_ratio": 1.0},
+                {"cpu": "2", "memory": "1073741824"},
+                {"cpu": "2000m", "memory": "1073741824"},
+            ),
+            (
+                {"cpu": "50m", "cpu_request": "200m"},
+                {"cpu": "0.2"},
+                {"cpu": "200m", "memory": "200Mi"},
+            ),
+        ],
+    )
+    def test_resource_requirements_from_config(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        config: dict,
+        expected_limits: dict,
+        expected_requests: dict,
+    ) -> None:
+        state_in = replace(create_state(relations=[peer_relation]), config=config)
+
+        with context(context.on.config_changed(), state_in) as mgr:
+            resource_reqs = mgr.charm._resource_reqs_from_config()
+
+        assert resource_reqs.limits == expected_limits
+        assert resource_reqs.requests == expected_requests
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"memory_request": "lots"},
+            {"cpu_request": "-1"},
+            {"resource_request_ratio": 1.5},
+            {"resource_request_ratio": 0.0},
+        ],
+    )
+    def test_invalid_resource_requirements_blocked(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        config: dict,
+    ) -> None:
+        state_in = replace(create_state(relations=[peer_relation]), config=config)
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        assert isinstance(state_out.unit_status, BlockedStatus)
+        assert "Invalid resource" in state_out.unit_status.message
+
+    @pytest.mark.parametrize(
+        "config, expected",
+        [
+            ({"cpu": "1500m", "memory": "1Gi"}, {"GOMAXPROCS": "1", "GOMEMLIMIT": "966367641"}),
+            (
+                {"cpu": "1", "memory": "1Gi", "cpu_request": "2", "memory_request": "2Gi"},
+                {"GOMAXPROCS": "2", "GOMEMLIMIT": "1932735283"},
+            ),
+            (
+                {"cpu": "2", "memory": "1Gi", "gomaxprocs": 4, "gomemlimit": "900MiB"},
+                {"GOMAXPROCS": "4", "GOMEMLIMIT": "900MiB"},
+            ),
+            ({}, {}),
+        ],
+    )
+    def test_config_changed_sets_go_runtime_limits(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        config: dict,
+        expected: dict,
+    ) -> None:
+        state_in = replace(create_state(relations=[peer_relation]), config=config)
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert {key: env[key] for key in ("GOMAXPROCS", "GOMEMLIMIT") if key in env} == expected
+
+    @pytest.mark.parametrize(
+        "config, message",
+        [
+            ({"gomaxprocs": 0}, "Invalid gomaxprocs 0, must be at least 1"),
+            ({"gomemlimit": "900M"}, 'Invalid gomemlimit "900M", expected e.g. "900MiB"'),
+        ],
+    )
+    def test_invalid_go_runtime_overrides_blocked(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        config: dict,
+        message: str,
+    ) -> None:
+        state_in = replace(create_state(relations=[peer_relation]), config=config)
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        assert state_out.unit_status == BlockedStatus(message)
+        assert not state_out.get_container(WORKLOAD_CONTAINER_NAME).layers
+
+
+class TestHookProfiling:
+    """Tests for the hook profiling option and get-hook-profiles action."""
+
+    def test_hook_profiling_enabled(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        mocker: MockerFixture,
+        tmp_path: Path,
+    ) -> None:
+        mocker.patch("charm.HOOK_PROFILES_PATH", tmp_path)
+        state_in = replace(
+            create_state(relations=[peer_relation]), config={"hook_profiling": True}
+        )
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        context.run(context.on.update_status(), state_out)
+
+        assert len(list(tmp_path.glob("*-update-status.prof"))) == 1
+        context.run(context.on.action("get-hook-profiles", params={"limit": 1}), state_out)
+        assert context.action_results["profiles"] == "1"
+        assert "update-status" in context.action_results["slowest-hooks"]
+
+    def test_hook_profiling_disabled(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        mocker: MockerFixture,
+        tmp_path: Path,
+    ) -> None:
+        mocker.patch("charm.HOOK_PROFILES_PATH", tmp_path)
+        state_in = create_state(relations=[peer_relation])
+
+        context.run(context.on.update_status(), state_in)
+
+        assert not list(tmp_path.iterdir())
+        with pytest.raises(ops.testing.ActionFailed):
+            context.run(context.on.action("get-hook-profiles", params={"limit": 1}), state_in)
+
+
+class TestUpdateStatusEvent:
+    """Tests for update-status event handling."""
+
+    def test_update_status_does_not_build_observability_libs(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+
+        with context(context.on.update_status(), state_in) as mgr:
+            mgr.run()
+            charm = mgr.charm
+
+        assert charm.metrics_endpoint is None
+        assert charm._log_forwarder is None
+        assert charm._grafana_dashboards is None
+        assert charm.resources_patch is None
+
+    def test_update_status_without_drift_skips_reconcile(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_in = context.run(context.on.pebble_ready(container), state_in)
+        plan = mocker.spy(PebbleService, "plan")
+
+        state_out = context.run(context.on.update_status(), state_in)
+
+        plan.assert_not_called()
+        assert state_out.unit_status == ActiveStatus()
+
+    def test_update_status_restarts_stopped_service(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_in = context.run(context.on.pebble_ready(container), state_in)
+        container = replace(
+            state_in.get_container(WORKLOAD_CONTAINER_NAME),
+            service_statuses={WORKLOAD_CONTAINER_NAME: ServiceStatus.INACTIVE},
+        )
+        state_in = replace(state_in, containers=[container])
+
+        state_out = context.run(context.on.update_status(), state_in)
+
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        assert container_out.service_statuses[WORKLOAD_CONTAINER_NAME] == ServiceStatus.ACTIVE
+        assert state_out.unit_status == ActiveStatus()
+
+    def test_update_status_reconciles_changed_plan(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_in = context.run(context.on.pebble_ready(container), state_in)
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        layer = container.layers[WORKLOAD_CONTAINER_NAME].to_dict()
+        layer["services"][WORKLOAD_CONTAINER_NAME]["environment"]["LOG_LEVEL"] = "error"
+        container = replace(container, layers={WORKLOAD_CONTAINER_NAME: Layer(layer)})
+        state_in = replace(state_in, containers=[container])
+        plan = mocker.spy(PebbleService, "plan")
+
+        state_out = context.run(context.on.update_status(), state_in)
+
+        plan.assert_called_once()
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        layer = container_out.layers[WORKLOAD_CONTAINER_NAME]
+        assert layer.services[WORKLOAD_CONTAINER_NAME].environment["LOG_LEVEL"] == "info"
+
 
 class TestKratosRelationEvents:
     """Tests for kratos-info relation event handling."""
@@ -134,6 +438,580 @@ class TestKratosRelationEvents:
         assert env["FEATURE_FLAGS"] == kratos_data["feature_flags"]
 
 
+class TestCoalescedReconcile:
+    """Tests for the end of dispatch reconcile of the changed inputs."""
+
+    def test_relation_change_after_restart_applied_in_same_dispatch(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        kratos_relation = replace(
+            state_out.get_relation(kratos_relation.id),
+            remote_app_data={
+                **kratos_relation.remote_app_data,
+                "public_endpoint": "http://kratos-public-url:80/changed",
+            },
+        )
+        state_in = replace(state_out, relations=[peer_relation, kratos_relation])
+
+        state_out = context.run(context.on.relation_changed(kratos_relation), state_in)
+
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert env["KRATOS_PUBLIC_URL"] == "http://kratos-public-url:80/changed"
+        assert state_out.unit_status == ActiveStatus()
+
+
+class TestWorkloadReadiness:
+    """Tests for the gating of the unit status on the workload ready check."""
+
+    @pytest.fixture
+    def cold_state(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        login_ui_endpoints_relation: ops.testing.Relation,
+    ) -> ops.testing.State:
+        """A started workload whose ready check did not pass yet."""
+        state_in = create_state(relations=[peer_relation, login_ui_endpoints_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        with patch.object(PebbleService, "is_ready", return_value=False):
+            return context.run(context.on.pebble_ready(container), state_in)
+
+    def test_layer_checks_configured(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = replace(
+            create_state(relations=[peer_relation]),
+            config={
+                "health_check_period": "5s",
+                "health_check_timeout": "1s",
+                "health_check_threshold": 5,
+            },
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        checks = {name: check.to_dict() for name, check in layer.checks.items()}
+        assert {name: check["level"] for name, check in checks.items()} == {
+            WORKLOAD_ALIVE_CHECK: "alive",
+            WORKLOAD_READY_CHECK: "ready",
+        }
+        assert all(
+            (check["period"], check["timeout"], check["threshold"]) == ("5s", "1s", 5)
+            for check in checks.values()
+        )
+
+    @pytest.mark.parametrize(
+        "config, message",
+        [
+            (
+                {"health_check_period": "10"},
+                'Invalid health_check_period "10", expected e.g. "30s"',
+            ),
+            (
+                {"health_check_period": "5s", "health_check_timeout": "5s"},
+                'Invalid health_check_timeout "5s", must be lower than health_check_period "5s"',
+            ),
+            (
+                {"health_check_threshold": 0},
+                "Invalid health_check_threshold 0, must be at least 1",
+            ),
+        ],
+    )
+    def test_invalid_health_check_settings_blocked(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        config: dict,
+        message: str,
+    ) -> None:
+        state_in = replace(create_state(relations=[peer_relation]), config=config)
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        assert state_out.unit_status == BlockedStatus(message)
+        assert not state_out.get_container(WORKLOAD_CONTAINER_NAME).layers
+
+    def test_plan_digest_ignores_pebble_duration_format(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = replace(
+            create_state(relations=[peer_relation]),
+            config={"health_check_period": "1m30s", "health_check_timeout": "1m"},
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        # Pebble reports the durations in the Go format
+        container = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        layer = container.layers[WORKLOAD_CONTAINER_NAME].to_dict()
+        for check in layer["checks"].values():
+            check.update(period="90s", timeout="1m0s")
+        container = replace(container, layers={WORKLOAD_CONTAINER_NAME: Layer(layer)})
+        replan = patch.object(Container, "replan")
+
+        with replan as replan_mock:
+            state_out = context.run(
+                context.on.update_status(), replace(state_out, containers=[container])
+            )
+
+        replan_mock.assert_not_called()
+        assert state_out.unit_status == ActiveStatus()
+
+    def test_waiting_after_restart_until_ready_check_recovered(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state = started_state(context, create_state(relations=[peer_relation, kratos_relation]))
+        kratos_relation = replace(
+            state.get_relation(kratos_relation.id),
+            remote_app_data={
+                **kratos_relation.remote_app_data,
+                "public_endpoint": "http://kratos-public-url:80/changed",
+            },
+        )
+        container = replace(
+            state.get_container(WORKLOAD_CONTAINER_NAME),
+            check_infos={
+                replace(info, status=CheckStatus.DOWN, successes=0)
+                for info in state.get_container(WORKLOAD_CONTAINER_NAME).check_infos
+            },
+        )
+        state_in = replace(
+            state, containers=[container], relations=[peer_relation, kratos_relation]
+        )
+        sleep = mocker.patch("time.sleep")
+
+        state_out = context.run(context.on.relation_changed(kratos_relation), state_in)
+
+        sleep.assert_not_called()
+        assert state_out.unit_status == WaitingStatus("Waiting for the workload to be ready")
+
+        container = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        container = replace(
+            container,
+            check_infos={
+                replace(info, status=CheckStatus.UP, successes=1) for info in container.check_infos
+            },
+        )
+        info = next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+        state_out = context.run(
+            context.on.pebble_check_recovered(container, info),
+            replace(state_out, containers=[container]),
+        )
+
+        assert state_out.unit_status == ActiveStatus()
+
+    def test_waiting_until_workload_ready(
+        self,
+        login_ui_endpoints_relation: ops.testing.Relation,
+        cold_state: ops.testing.State,
+    ) -> None:
+        assert cold_state.unit_status == WaitingStatus("Waiting for the workload to be ready")
+        relation = cold_state.get_relation(login_ui_endpoints_relation.id)
+        assert "login_url" not in relation.local_app_data
+
+    def test_active_and_endpoints_published_once_ready(
+        self,
+        context: ops.testing.Context,
+        login_ui_endpoints_relation: ops.testing.Relation,
+        cold_state: ops.testing.State,
+    ) -> None:
+        state_out = context.run(context.on.update_status(), cold_state)
+
+        assert state_out.unit_status == ActiveStatus()
+        relation = state_out.get_relation(login_ui_endpoints_relation.id)
+        assert relation.local_app_data["login_url"] == "/ui/login"
+
+
+class TestWorkloadHealthEvents:
+    """Tests for the reaction to the workload Pebble check events."""
+
+    @pytest.fixture
+    def ready_state(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> ops.testing.State:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        return context.run(context.on.pebble_ready(container), state_in)
+
+    @staticmethod
+    def _check(state: ops.testing.State, name: str, **changes: Any) -> ops.testing.State:
+        container = state.get_container(WORKLOAD_CONTAINER_NAME)
+        container = replace(
+            container,
+            check_infos={
+                replace(info, **changes) if info.name == name else info
+                for info in container.check_infos
+            },
+        )
+        return replace(state, containers=[container])
+
+    def test_alive_check_failure_restart_configured(self, ready_state: ops.testing.State) -> None:
+        layer = ready_state.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+
+        service = layer.services[WORKLOAD_CONTAINER_NAME]
+        assert service.on_check_failure == {WORKLOAD_ALIVE_CHECK: "restart"}
+
+    def test_ready_check_failed(
+        self, context: ops.testing.Context, ready_state: ops.testing.State
+    ) -> None:
+        state_in = self._check(
+            ready_state, WORKLOAD_READY_CHECK, status=CheckStatus.DOWN, failures=3
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        info = next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+
+        state_out = context.run(context.on.pebble_check_failed(container, info), state_in)
+
+        assert state_out.unit_status == WaitingStatus("Waiting for the workload to be ready")
+
+    def test_ready_check_recovered(
+        self, context: ops.testing.Context, ready_state: ops.testing.State
+    ) -> None:
+        state_in = self._check(
+            ready_state, WORKLOAD_READY_CHECK, status=CheckStatus.DOWN, failures=3
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        info = next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+        state_in = context.run(context.on.pebble_check_failed(container, info), state_in)
+        state_in = self._check(
+            state_in, WORKLOAD_READY_CHECK, status=CheckStatus.UP, failures=0, successes=1
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        info = next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+
+        state_out = context.run(context.on.pebble_check_recovered(container, info), state_in)
+
+        assert state_out.unit_status == ActiveStatus()
+
+
+class TestRollingRestarts:
+    """Tests for the peer coordinated restarts of the workload."""
+
+    @staticmethod
+    def _change_kratos(
+        state: ops.testing.State, kratos_relation: ops.testing.Relation
+    ) -> ops.testing.Relation:
+        return replace(
+            state.get_relation(kratos_relation.id),
+            remote_app_data={
+                **kratos_relation.remote_app_data,
+                "public_endpoint": "http://kratos-public-url:80/changed",
+            },
+        )
+
+    def test_leader_grants_lock_up_to_max_concurrent_restarts(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            peers_data={
+                1: {RESTART_REQUEST_KEY: "requested"},
+                2: {RESTART_REQUEST_KEY: "requested"},
+            },
+        )
+        state_in = create_state(relations=[peer_relation])
+
+        state_out = context.run(
+            context.on.relation_changed(peer_relation, remote_unit=1), state_in
+        )
+
+        app_data = state_out.get_relation(peer_relation.id).local_app_data
+        assert json.loads(app_data[RESTART_GRANTED_KEY]) == [
+            "identity-platform-login-ui-operator/1"
+        ]
+
+        state_out = context.run(
+            context.on.relation_changed(peer_relation, remote_unit=1),
+            replace(state_in, config={"max_concurrent_restarts": 2}),
+        )
+
+        app_data = state_out.get_relation(peer_relation.id).local_app_data
+        assert json.loads(app_data[RESTART_GRANTED_KEY]) == [
+            "identity-platform-login-ui-operator/1",
+            "identity-platform-login-ui-operator/2",
+        ]
+
+    def test_departed_holder_grant_passed_on(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/1"])
+            },
+            peers_data={2: {RESTART_REQUEST_KEY: "requested"}},
+        )
+        state_in = create_state(relations=[peer_relation])
+
+        state_out = context.run(
+            context.on.relation_departed(peer_relation, remote_unit=1, departing_unit=1),
+            state_in,
+        )
+
+        app_data = state_out.get_relation(peer_relation.id).local_app_data
+        assert json.loads(app_data[RESTART_GRANTED_KEY]) == [
+            "identity-platform-login-ui-operator/2"
+        ]
+
+    def test_new_leader_regrants_lock(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/3"])
+            },
+            peers_data={
+                1: {RESTART_REQUEST_KEY: "requested"},
+                2: {RESTART_REQUEST_KEY: "requested"},
+            },
+        )
+        state_in = create_state(relations=[peer_relation])
+
+        state_out = context.run(context.on.leader_elected(), state_in)
+
+        app_data = state_out.get_relation(peer_relation.id).local_app_data
+        assert json.loads(app_data[RESTART_GRANTED_KEY]) == [
+            "identity-platform-login-ui-operator/1"
+        ]
+
+    def test_restart_waits_for_lock(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/1"])
+            },
+            peers_data={1: {RESTART_REQUEST_KEY: "requested"}},
+        )
+        state_in = create_state(leader=False, relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        kratos_relation = self._change_kratos(state_out, kratos_relation)
+        state_in = replace(state_out, relations=[peer_relation, kratos_relation])
+
+        state_out = context.run(context.on.relation_changed(kratos_relation), state_in)
+
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert env["KRATOS_PUBLIC_URL"] == "http://kratos-public-url:80/testing-kratos"
+        assert state_out.unit_status == WaitingStatus("Waiting for the restart lock")
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert local_unit_data[RESTART_REQUEST_KEY] == "requested"
+
+    def test_changes_while_waiting_applied_in_a_single_restart(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+        hydra_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/1"])
+            },
+            peers_data={1: {RESTART_REQUEST_KEY: "requested"}},
+        )
+        state_in = create_state(
+            leader=False, relations=[peer_relation, kratos_relation, hydra_relation]
+        )
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        add_layer = mocker.spy(Container, "add_layer")
+
+        kratos_relation = self._change_kratos(state_out, kratos_relation)
+        state_out = context.run(
+            context.on.relation_changed(kratos_relation),
+            replace(state_out, relations=[peer_relation, kratos_relation, hydra_relation]),
+        )
+        hydra_relation = replace(
+            state_out.get_relation(hydra_relation.id),
+            remote_app_data={
+                **hydra_relation.remote_app_data,
+                "admin_endpoint": "http://hydra-admin-url:80/changed",
+            },
+        )
+        state_out = context.run(
+            context.on.relation_changed(hydra_relation),
+            replace(state_out, relations=[peer_relation, kratos_relation, hydra_relation]),
+        )
+        assert state_out.unit_status == WaitingStatus("Waiting for the restart lock")
+        assert add_layer.call_count == 0
+
+        peer_relation = replace(
+            state_out.get_relation(peer_relation.id),
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/0"])
+            },
+            peers_data={},
+        )
+        state_out = context.run(
+            context.on.relation_changed(peer_relation, remote_unit=1),
+            replace(state_out, relations=[peer_relation, kratos_relation, hydra_relation]),
+        )
+
+        assert add_layer.call_count == 1
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert env["KRATOS_PUBLIC_URL"] == "http://kratos-public-url:80/changed"
+        assert env["HYDRA_ADMIN_URL"] == "http://hydra-admin-url:80/changed"
+
+    def test_lock_request_withdrawn_when_change_reverted(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/1"])
+            },
+            peers_data={1: {RESTART_REQUEST_KEY: "requested"}},
+        )
+        state_in = create_state(leader=False, relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        changed_kratos = self._change_kratos(state_out, kratos_relation)
+        state_out = context.run(
+            context.on.relation_changed(changed_kratos),
+            replace(state_out, relations=[peer_relation, changed_kratos]),
+        )
+        assert state_out.unit_status == WaitingStatus("Waiting for the restart lock")
+
+        reverted_kratos = replace(
+            state_out.get_relation(kratos_relation.id),
+            remote_app_data=kratos_relation.remote_app_data,
+        )
+        peer_relation = state_out.get_relation(peer_relation.id)
+        state_out = context.run(
+            context.on.relation_changed(reverted_kratos),
+            replace(state_out, relations=[peer_relation, reverted_kratos]),
+        )
+
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert RESTART_REQUEST_KEY not in local_unit_data
+        assert state_out.unit_status == ActiveStatus()
+
+        peer_relation = replace(
+            state_out.get_relation(peer_relation.id),
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/0"])
+            },
+            peers_data={},
+        )
+        state_out = context.run(
+            context.on.update_status(),
+            replace(state_out, relations=[peer_relation, reverted_kratos]),
+        )
+
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert RESTART_REQUEST_KEY not in local_unit_data
+
+    def test_lock_request_withdrawn_on_cold_start(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+    ) -> None:
+        peer_relation = replace(
+            peer_relation,
+            local_app_data={
+                RESTART_GRANTED_KEY: json.dumps(["identity-platform-login-ui-operator/1"])
+            },
+            peers_data={1: {RESTART_REQUEST_KEY: "requested"}},
+        )
+        state_in = create_state(leader=False, relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        kratos_relation = self._change_kratos(state_out, kratos_relation)
+        state_out = context.run(
+            context.on.relation_changed(kratos_relation),
+            replace(state_out, relations=[peer_relation, kratos_relation]),
+        )
+        assert state_out.unit_status == WaitingStatus("Waiting for the restart lock")
+
+        container = replace(
+            state_out.get_container(WORKLOAD_CONTAINER_NAME),
+            service_statuses={WORKLOAD_CONTAINER_NAME: ServiceStatus.INACTIVE},
+        )
+        state_out = context.run(
+            context.on.pebble_ready(container), replace(state_out, containers=[container])
+        )
+
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert RESTART_REQUEST_KEY not in local_unit_data
+
+    def test_lock_released_once_workload_alive(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_out = context.run(context.on.pebble_ready(container), state_in)
+        kratos_relation = self._change_kratos(state_out, kratos_relation)
+        container = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        container = replace(
+            container,
+            check_infos={replace(info, successes=0) for info in container.check_infos},
+        )
+        state_in = replace(
+            state_out, containers=[container], relations=[peer_relation, kratos_relation]
+        )
+
+        state_out = context.run(context.on.relation_changed(kratos_relation), state_in)
+
+        layer = state_out.get_container(WORKLOAD_CONTAINER_NAME).layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert env["KRATOS_PUBLIC_URL"] == "http://kratos-public-url:80/changed"
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert local_unit_data[RESTART_REQUEST_KEY] == "requested"
+
+        container = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        container = replace(
+            container,
+            check_infos={replace(info, successes=1) for info in container.check_infos},
+        )
+        state_out = context.run(
+            context.on.update_status(), replace(state_out, containers=[container])
+        )
+
+        local_unit_data = state_out.get_relation(peer_relation.id).local_unit_data
+        assert RESTART_REQUEST_KEY not in local_unit_data
+
+
 class TestHydraRelationEvents:
     """Tests for hydra-endpoint-info relation event handling."""
 
@@ -234,6 +1112,115 @@ class TestTempoRelationEvents:
         )
         assert env["TRACING_ENABLED"] is True
 
+    def test_tracing_change_only_updates_the_layer(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        tempo_relation: ops.testing.Relation,
+        public_route_relation: ops.testing.Relation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(
+            relations=[
+                peer_relation,
+                tempo_relation,
+                public_route_relation,
+                certificate_transfer_relation,
+            ]
+        )
+        push = mocker.spy(Container, "push")
+        submit_to_traefik = mocker.spy(TraefikRouteRequirer, "submit_to_traefik")
+
+        state_out = context.run(context.on.relation_changed(tempo_relation), state_in)
+
+        submit_to_traefik.assert_not_called()
+        assert BUNDLE_PATH not in [c.args[1] for c in push.call_args_list]
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        layer = container_out.layers[WORKLOAD_CONTAINER_NAME]
+        assert layer.services[WORKLOAD_CONTAINER_NAME].environment["TRACING_ENABLED"] is True
+
+    def test_charm_traces_sent_to_tempo(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        tempo_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        set_destination = mocker.patch.object(ops.tracing, "set_destination")
+        state_in = create_state(relations=[peer_relation, tempo_relation])
+
+        context.run(context.on.relation_changed(tempo_relation), state_in)
+
+        set_destination.assert_called_with(
+            url="http://tempo-k8s-0.tempo-k8s-endpoints.namespace.svc.cluster.local:4318/v1/traces",
+            ca=None,
+        )
+
+    def test_charm_traces_not_sent_after_tempo_removed(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        tempo_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        set_destination = mocker.patch.object(ops.tracing, "set_destination")
+        state_in = create_state(relations=[peer_relation, tempo_relation])
+
+        context.run(context.on.relation_broken(tempo_relation), state_in)
+
+        set_destination.assert_called_with(url=None, ca=None)
+
+    def test_charm_traces_ca_updated_on_ca_bundle_change(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        tempo_relation: ops.testing.Relation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        tempo_relation = replace(
+            tempo_relation,
+            remote_app_data={
+                "receivers": json.dumps([
+                    {
+                        "protocol": {"name": "otlp_http", "type": "http"},
+                        "url": "https://tempo-k8s-0.tempo-k8s-endpoints.namespace.svc.cluster.local:4318",
+                    }
+                ])
+            },
+        )
+        ca_relation = replace(certificate_transfer_relation, remote_units_data={0: {"ca": CA_A}})
+        state_in = create_state(relations=[peer_relation, tempo_relation, ca_relation])
+        set_destination = mocker.patch.object(ops.tracing, "set_destination")
+
+        context.run(context.on.relation_changed(ca_relation, remote_unit=0), state_in)
+
+        set_destination.assert_called_once_with(
+            url="https://tempo-k8s-0.tempo-k8s-endpoints.namespace.svc.cluster.local:4318/v1/traces",
+            ca=CA_A,
+        )
+
+    def test_reconcile_steps_traced(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+
+        context.run(context.on.pebble_ready(container), state_in)
+
+        spans = {span.name for span in context.trace_data}
+        assert {
+            "reconcile pebble-layer",
+            "reconcile ca-certs",
+            "CertTransfer.push_ca_certs",
+            "IntegrationSnapshot.load",
+            "PebbleService.render_pebble_layer",
+            "PebbleService.plan",
+        } <= spans
+
 
 class TestPublicRouteRelationEvents:
     """Tests for public-ingress relation event handling."""
@@ -251,6 +1238,47 @@ class TestPublicRouteRelationEvents:
 
         assert state_out.unit_status == ActiveStatus()
 
+    def test_public_route_config_submitted(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        public_route_relation: ops.testing.Relation,
+    ) -> None:
+        relation = replace(
+            public_route_relation,
+            remote_app_data={"external_host": "example.com", "scheme": "https"},
+        )
+        state_in = create_state(relations=[peer_relation, relation])
+
+        state_out = context.run(context.on.relation_changed(relation), state_in)
+
+        config = yaml.safe_load(state_out.get_relation(relation.id).local_app_data["config"])
+        routers = config["http"]["routers"]
+        tls_router = routers[
+            f"juju-{state_in.model.name}-{context.app_name}-public-api-router-ui-tls"
+        ]
+        assert tls_router["tls"]["domains"][0]["main"] == "example.com"
+        assert len(routers) == 16
+
+    def test_unchanged_public_route_config_not_resubmitted(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        public_route_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        relation = replace(
+            public_route_relation,
+            remote_app_data={"external_host": "example.com", "scheme": "https"},
+        )
+        state_in = create_state(relations=[peer_relation, relation])
+        state_in = context.run(context.on.relation_changed(relation), state_in)
+        submit_to_traefik = mocker.spy(TraefikRouteRequirer, "submit_to_traefik")
+
+        context.run(context.on.relation_changed(state_in.get_relation(relation.id)), state_in)
+
+        submit_to_traefik.assert_not_called()
+
     def test_public_route_broken(
         self,
         context: ops.testing.Context,
@@ -272,6 +1300,63 @@ class TestPublicRouteRelationEvents:
         assert state_out.unit_status == ActiveStatus()
 
 
+class TestLoginUIEndpointsRelationEvents:
+    """Tests for ui-endpoint-info relation event handling."""
+
+    @pytest.fixture
+    def ready_state(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        login_ui_endpoints_relation: ops.testing.Relation,
+    ) -> ops.testing.State:
+        state_in = create_state(relations=[peer_relation, login_ui_endpoints_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        return context.run(context.on.pebble_ready(container), state_in)
+
+    def test_endpoints_published(
+        self,
+        context: ops.testing.Context,
+        login_ui_endpoints_relation: ops.testing.Relation,
+        ready_state: ops.testing.State,
+    ) -> None:
+        relation = ready_state.get_relation(login_ui_endpoints_relation.id)
+
+        state_out = context.run(context.on.relation_created(relation), ready_state)
+
+        relation = state_out.get_relation(login_ui_endpoints_relation.id)
+        assert relation.local_app_data["login_url"] == "/ui/login"
+
+    def test_endpoints_not_published_before_workload_ready(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        login_ui_endpoints_relation: ops.testing.Relation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, login_ui_endpoints_relation])
+
+        state_out = context.run(context.on.relation_created(login_ui_endpoints_relation), state_in)
+
+        relation = state_out.get_relation(login_ui_endpoints_relation.id)
+        assert "login_url" not in relation.local_app_data
+
+    def test_unchanged_endpoints_not_rewritten(
+        self,
+        context: ops.testing.Context,
+        login_ui_endpoints_relation: ops.testing.Relation,
+        ready_state: ops.testing.State,
+        hook_tool_calls: Counter,
+    ) -> None:
+        relation = ready_state.get_relation(login_ui_endpoints_relation.id)
+        state_out = context.run(context.on.relation_created(relation), ready_state)
+        hook_tool_calls.clear()
+
+        relation = state_out.get_relation(login_ui_endpoints_relation.id)
+        context.run(context.on.relation_created(relation), state_out)
+
+        assert hook_tool_calls["relation-set"] == 0
+
+
 class TestHolisticHandler:
     """Tests for holistic event handling."""
 
@@ -313,6 +1398,204 @@ class TestHolisticHandler:
 
         assert state_out.unit_status == ActiveStatus()
 
+    def test_integrations_loaded_once_per_hook(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+        public_route_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, kratos_relation, public_route_relation])
+        load = mocker.spy(IntegrationSnapshot, "load")
+        kratos_is_ready = mocker.spy(KratosInfoRequirer, "is_ready")
+
+        context.run(context.on.update_status(), state_in)
+
+        load.assert_called_once()
+        kratos_is_ready.assert_called_once()
+
+    def test_unchanged_layer_skips_replan(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        kratos_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, kratos_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_in = context.run(context.on.pebble_ready(container), state_in)
+        add_layer = mocker.spy(Container, "add_layer")
+        replan = mocker.spy(Container, "replan")
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        add_layer.assert_not_called()
+        replan.assert_not_called()
+        assert state_out.unit_status == ActiveStatus()
+
+    def test_changed_layer_triggers_replan(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation])
+        container = state_in.get_container(WORKLOAD_CONTAINER_NAME)
+        state_in = context.run(context.on.pebble_ready(container), state_in)
+        state_in = replace(state_in, config={"log_level": "debug"})
+        add_layer = mocker.spy(Container, "add_layer")
+
+        state_out = context.run(context.on.config_changed(), state_in)
+
+        add_layer.assert_called_once()
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        layer = container_out.layers[WORKLOAD_CONTAINER_NAME]
+        env = layer.services[WORKLOAD_CONTAINER_NAME].environment
+        assert env["LOG_LEVEL"] == "debug"
+
+
+# Self-signed CA certificates, the system bundle trusts the first two
+CA_A = (
+    "-----BEGIN CERTIFICATE-----\n"
+    "MIIBeDCCAR2gAwIBAgIUVVote8uyMWoHW8Iqzb+Wh0A6rjYwCgYIKoZIzj0EAwIw\n"
+    "ETEPMA0GA1UEAwwGcm9vdC1hMB4XDTI2MTAxODEzMzEyOVoXDTM2MTAxNTEzMzEy\n"
+    "OVowETEPMA0GA1UEAwwGcm9vdC1hMFkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDQgAE\n"
+    "pfJsuiRioOA8liBfVBtiMxWSH/u0dpOrUJiGI4okaRGHFKhfgsVNh/TOfOmSgPsQ\n"
+    "d5epDWbI5Sf6c4IfpkbnsKNTMFEwHQYDVR0OBBYEFG9uIwHWTskW3cR2UwCsXjv1\n"
+    "Yh7lMB8GA1UdIwQYMBaAFG9uIwHWTskW3cR2UwCsXjv1Yh7lMA8GA1UdEwEB/wQF\n"
+    "MAMBAf8wCgYIKoZIzj0EAwIDSQAwRgIhAJCzS6/oqXgGL9+qItUd4hIbdoHxE03h\n"
+    "gJ3ekpXlnFo+AiEAw/Jv0TkprTW4+fS5tMf2nbDAg1lc/8FHMiIWyoJ31rE=\n"
+    "-----END CERTIFICATE-----"
+)
+CA_B = (
+    "-----BEGIN CERTIFICATE-----\n"
+    "MIIBdjCCAR2gAwIBAgIUGBL0e2FYRthAt2z13A7pO/mNEmAwCgYIKoZIzj0EAwIw\n"
+    "ETEPMA0GA1UEAwwGcm9vdC1iMB4XDTI2MTAxODEzMzEyOVoXDTM2MTAxNTEzMzEy\n"
+    "OVowETEPMA0GA1UEAwwGcm9vdC1iMFkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDQgAE\n"
+    "/I97eo4h/9KVLi8gGE3JFvbBvvL7mcIJby8i/OW02tE1ub7VM54fIMhMaAI1no9S\n"
+    "tIN6Nk2fC7anght/MyZjr6NTMFEwHQYDVR0OBBYEFMat9R7dT14T73Q819fKbCS2\n"
+    "5mQSMB8GA1UdIwQYMBaAFMat9R7dT14T73Q819fKbCS25mQSMA8GA1UdEwEB/wQF\n"
+    "MAMBAf8wCgYIKoZIzj0EAwIDRwAwRAIgIlCxwiWAhkCfO0AaVvxOyA/ONMUdvfPV\n"
+    "LgrNSMkz3dcCIFUHVQcPqsXMnKSsGI1lj4zSEMoFkbF4jtE9VN0YpfWr\n"
+    "-----END CERTIFICATE-----"
+)
+CA_C = (
+    "-----BEGIN CERTIFICATE-----\n"
+    "MIIBdjCCAR2gAwIBAgIUIkKFLaKm9Sx8gGA3FmMU+7D0kXcwCgYIKoZIzj0EAwIw\n"
+    "ETEPMA0GA1UEAwwGcm9vdC1jMB4XDTI2MTAxODEzMzEzNFoXDTM2MTAxNTEzMzEz\n"
+    "NFowETEPMA0GA1UEAwwGcm9vdC1jMFkwEwYHKoZIzj0CAQYIKoZIzj0DAQcDQgAE\n"
+    "4oVs5htIlIpZUCrAeSfbG8QCRyFkFnVh5BsEiLlaNT8fclq6q/oeIYpkU9ew1579\n"
+    "EJmSEJkzDUR8dwbgnIOz06NTMFEwHQYDVR0OBBYEFOzksY7NUDDJDL2zWo5bIKj7\n"
+    "NKwFMB8GA1UdIwQYMBaAFOzksY7NUDDJDL2zWo5bIKj7NKwFMA8GA1UdEwEB/wQF\n"
+    "MAMBAf8wCgYIKoZIzj0EAwIDRwAwRAIgZq+BBpTMseDttcIPihTDUuAlQR/r7MxJ\n"
+    "DOLLGItyx/cCIDnt20qHo4bT0eoEjJijqlRrqordt9uw0seVeEKI26Ex\n"
+    "-----END CERTIFICATE-----"
+)
+
+
+class TestCertificateTransferEvents:
+    """Tests for receive-ca-cert relation handling."""
+
+    def test_ca_bundle_is_deduplicated(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        certificate_transfer_relation: ops.testing.Relation,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, certificate_transfer_relation])
+
+        state_out = context.run(context.on.update_status(), state_in)
+
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        bundle = (container_out.get_filesystem(context) / BUNDLE_PATH.lstrip("/")).read_text()
+        assert bundle.count("-----BEGIN CERTIFICATE-----") == 1
+
+    def test_ca_bundle_merged_with_system_bundle(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        mocker.patch(
+            "certificate_transfer_integration.open",
+            mock_open(read_data=f"{CA_A}\n{CA_B}\n"),
+        )
+        # CA_B is also trusted by the system bundle, wrapped differently
+        relation = replace(
+            certificate_transfer_relation,
+            remote_units_data={0: {"ca": CA_B.replace("\n", "\n\n")}, 1: {"ca": CA_C}},
+        )
+        state_in = create_state(relations=[peer_relation, relation])
+        push = mocker.spy(Container, "push")
+
+        state_out = context.run(context.on.update_status(), state_in)
+        container_out = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        bundle = (container_out.get_filesystem(context) / BUNDLE_PATH.lstrip("/")).read_text()
+        context.run(context.on.update_status(), state_out)
+
+        assert bundle.count("-----BEGIN CERTIFICATE-----") == 3
+        assert (
+            parse_certificates(bundle).keys() == parse_certificates(f"{CA_A}{CA_B}{CA_C}").keys()
+        )
+        assert [c.args[1] for c in push.call_args_list].count(BUNDLE_PATH) == 1
+
+    def test_unchanged_ca_bundle_is_not_pushed_again(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, certificate_transfer_relation])
+        push = mocker.spy(Container, "push")
+
+        state_out = context.run(context.on.update_status(), state_in)
+        context.run(context.on.update_status(), state_out)
+
+        assert [c.args[1] for c in push.call_args_list].count(BUNDLE_PATH) == 1
+
+    def test_changed_ca_bundle_is_pushed(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, certificate_transfer_relation])
+        push = mocker.spy(Container, "push")
+
+        state_out = context.run(context.on.update_status(), state_in)
+        relation = replace(
+            state_out.get_relation(certificate_transfer_relation.id),
+            remote_units_data={
+                0: {
+                    "ca": "-----BEGIN CERTIFICATE-----\nYW5vdGhlci1jYQ==\n-----END CERTIFICATE-----"
+                }
+            },
+        )
+        state_out = replace(state_out, relations=[peer_relation, relation])
+        context.run(context.on.relation_changed(relation, remote_unit=0), state_out)
+
+        assert [c.args[1] for c in push.call_args_list].count(BUNDLE_PATH) == 2
+
+    def test_pebble_ready_pushes_ca_bundle(
+        self,
+        context: ops.testing.Context,
+        peer_relation: ops.testing.PeerRelation,
+        certificate_transfer_relation: ops.testing.Relation,
+        mocker: MockerFixture,
+    ) -> None:
+        state_in = create_state(relations=[peer_relation, certificate_transfer_relation])
+        push = mocker.spy(Container, "push")
+
+        state_out = context.run(context.on.update_status(), state_in)
+        container = state_out.get_container(WORKLOAD_CONTAINER_NAME)
+        context.run(context.on.pebble_ready(container), state_out)
+
+        assert [c.args[1] for c in push.call_args_list].count(BUNDLE_PATH) == 2
+
 
 class TestStatusManagement:
     """Tests for status management and error handling."""
@@ -0,0 +1,83 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+import pytest
+
+from configs import GoRuntimeConfig, HealthCheckConfig, ResourceRequestConfig, duration_seconds
+from exceptions import InvalidConfigError
+
+
+@pytest.mark.parametrize(
+    "config_class", [GoRuntimeConfig, HealthCheckConfig, ResourceRequestConfig]
+)
+def test_config_defaults(config_class: type) -> None:
+    assert config_class.load({}) == config_class()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("10s", 10), ("1m", 60), ("1m30s", 90), ("1h0m0s", 3600), ("500ms", 0.5), ("1.5s", 1.5)],
+)
+def test_duration_seconds(value: str, expected: float) -> None:
+    assert duration_seconds(value) == expected
+
+
+def test_health_check_config() -> None:
+    config = HealthCheckConfig.load({
+        "health_check_period": "1m",
+        "health_check_timeout": "5s",
+        "health_check_threshold": 1,
+    })
+
+    assert config == HealthCheckConfig(period="1m", timeout="5s", threshold=1)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"health_check_period": "10"},
+        {"health_check_timeout": "soon"},
+        {"health_check_timeout": "10s"},
+        {"health_check_period": "2s", "health_check_timeout": "3s"},
+        {"health_check_threshold": 0},
+    ],
+)
+def test_invalid_health_check_config(config: dict) -> None:
+    with pytest.raises(InvalidConfigError):
+        HealthCheckConfig.load(config)
+
+
+@pytest.mark.parametrize("gomemlimit", ["900MiB", "1GiB", "123456789", "512B", "off"])
+def test_go_runtime_config(gomemlimit: str) -> None:
+    config = GoRuntimeConfig.load({"gomaxprocs": 1, "gomemlimit": gomemlimit})
+
+    assert config == GoRuntimeConfig(gomaxprocs=1, gomemlimit=gomemlimit)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"gomaxprocs": 0},
+        {"gomaxprocs": -2},
+        {"gomemlimit": "900M"},
+        {"gomemlimit": "1.5GiB"},
+        {"gomemlimit": "900 MiB"},
+        {"gomemlimit": ""},
+    ],
+)
+def test_invalid_go_runtime_config(config: dict) -> None:
+    with pytest.raises(InvalidConfigError):
+        GoRuntimeConfig.load(config)
+
+
+@pytest.mark.parametrize("ratio, expected", [(0.5, 0.5), (1, 1.0), ("0.25", 0.25)])
+def test_resource_request_config(ratio: object, expected: float) -> None:
+    config = ResourceRequestConfig.load({"resource_request_ratio": ratio})
+
+    assert config == ResourceRequestConfig(ratio=expected)
+
+
+@pytest.mark.parametrize("ratio", [0, -0.5, 1.5])
+def test_invalid_resource_request_config(ratio: float) -> None:
+    with pytest.raises(InvalidConfigError):
+        ResourceRequestConfig.load({"resource_request_ratio": ratio})
@@ -0,0 +1,46 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+from pathlib import Path
+
+from hook_profiling import HookProfiler, summarise_hook_profiles
+
+
+def profile_hook(path: Path, hook: str, max_profiles: int = 5) -> None:
+    profiler = HookProfiler(hook, path, max_profiles)
+    profiler.start()
+    sorted(range(1000), reverse=True)
+    profiler.stop()
+
+
+def test_hook_profile_stored(tmp_path: Path) -> None:
+    profile_hook(tmp_path, "update-status")
+
+    assert len(list(tmp_path.glob("*-update-status.prof"))) == 1
+    assert len(list(tmp_path.glob("*-update-status.json"))) == 1
+
+
+def test_hook_profiles_rotated(tmp_path: Path) -> None:
+    for hook in ("install", "config-changed", "update-status"):
+        profile_hook(tmp_path, hook, max_profiles=2)
+
+    assert sorted(p.name.split("-", 1)[1] for p in tmp_path.glob("*.json")) == [
+        "config-changed.json",
+        "update-status.json",
+    ]
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+
+def test_summarise_hook_profiles(tmp_path: Path) -> None:
+    for hook in ("install", "config-changed", "update-status"):
+        profile_hook(tmp_path, hook)
+
+    summary = summarise_hook_profiles(tmp_path, limit=2)
+
+    assert summary["profiles"] == "3"
+    assert len(summary["slowest-hooks"].splitlines()) == 2
+    assert len(summary["hottest-functions"].splitlines()) == 2
+
+
+def test_summarise_without_hook_profiles(tmp_path: Path) -> None:
+    assert summarise_hook_profiles(tmp_path / "missing") == {}
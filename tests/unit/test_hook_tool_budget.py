@@ -0,0 +1,219 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Hook tool call budgets for the charm event handlers.
+
+Every hook tool call is a subprocess and every Pebble call a round-trip to the
+workload container, so these budgets guard the hook latency against regressions.
+Lower a budget when an optimisation reduces the calls, never raise it silently.
+"""
+
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Callable
+
+import ops.testing
+import pytest
+from ops.pebble import CheckStatus
+
+from constants import WORKLOAD_CONTAINER_NAME, WORKLOAD_READY_CHECK
+
+from .conftest import create_state, started_state
+
+EventFactory = Callable[[ops.testing.Context, ops.testing.State], Any]
+
+
+# Budget of a full reconcile, the ready check is queried until it first passes
+COMMON_BUDGET = {
+    "config-get": 1,
+    "is-leader": 1,
+    "pebble": 11,
+    "relation-get": 10,
+    "relation-ids": 8,
+    "relation-list": 7,
+    "relation-set": 4,
+    "status-set": 1,
+}
+# Budget of a reconcile limited to the steps depending on one input
+INPUT_BUDGET = {
+    **COMMON_BUDGET,
+    "pebble": 7,
+    "relation-get": 7,
+    "relation-ids": 7,
+    "relation-list": 6,
+    "relation-set": 1,
+}
+# Budget of an update-status that only verifies the workload
+UPDATE_STATUS_WITHOUT_DRIFT_BUDGET = {
+    "is-leader": 1,
+    "pebble": 2,
+    "relation-get": 1,
+    "relation-ids": 2,
+    "relation-list": 2,
+    "relation-set": 2,
+    "status-set": 1,
+}
+# Budget of a check event, only updating the status of a started workload
+CHECK_EVENT_BUDGET = {**UPDATE_STATUS_WITHOUT_DRIFT_BUDGET, "pebble": 0}
+
+
+def _ready_check(state: ops.testing.State) -> ops.testing.CheckInfo:
+    container = state.get_container(WORKLOAD_CONTAINER_NAME)
+    return next(info for info in container.check_infos if info.name == WORKLOAD_READY_CHECK)
+
+
+EVENTS: dict[str, tuple[EventFactory, dict[str, int]]] = {
+    "pebble-ready": (
+        lambda ctx, state: ctx.on.pebble_ready(state.get_container(WORKLOAD_CONTAINER_NAME)),
+        {**COMMON_BUDGET, "open-port": 1, "pebble": 14, "relation-ids": 10, "status-set": 2},
+    ),
+    "config-changed": (
+        lambda ctx, state: ctx.on.config_changed(),
+        {**INPUT_BUDGET, "status-set": 2},
+    ),
+    "update-status": (
+        lambda ctx, state: ctx.on.update_status(),
+        COMMON_BUDGET,
+    ),
+    "login-ui-pebble-check-failed": (
+        lambda ctx, state: ctx.on.pebble_check_failed(
+            state.get_container(WORKLOAD_CONTAINER_NAME), _ready_check(state)
+        ),
+        CHECK_EVENT_BUDGET,
+    ),
+    "login-ui-pebble-check-recovered": (
+        lambda ctx, state: ctx.on.pebble_check_recovered(
+            state.get_container(WORKLOAD_CONTAINER_NAME), _ready_check(state)
+        ),
+        CHECK_EVENT_BUDGET,
+    ),
+    "kratos-info-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(state.get_relations("kratos-info")[0]),
+        INPUT_BUDGET,
+    ),
+    "hydra-endpoint-info-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(state.get_relations("hydra-endpoint-info")[0]),
+        INPUT_BUDGET,
+    ),
+    "tenant-service-info-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(state.get_relations("tenant-service-info")[0]),
+        INPUT_BUDGET,
+    ),
+    "tenant-service-info-relation-broken": (
+        lambda ctx, state: ctx.on.relation_broken(state.get_relations("tenant-service-info")[0]),
+        {**INPUT_BUDGET, "relation-get": 6, "relation-list": 9},
+    ),
+    "tracing-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(state.get_relations("tracing")[0]),
+        INPUT_BUDGET,
+    ),
+    "peer-relation-created": (
+        lambda ctx, state: ctx.on.relation_created(
+            state.get_relations("identity-platform-login-ui")[0]
+        ),
+        {**INPUT_BUDGET, "relation-set": 2},
+    ),
+    "public-route-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(state.get_relations("public-route")[0]),
+        {**INPUT_BUDGET, "relation-get": 8, "relation-ids": 7, "relation-set": 3, "status-set": 2},
+    ),
+    "public-route-relation-broken": (
+        lambda ctx, state: ctx.on.relation_broken(state.get_relations("public-route")[0]),
+        {**INPUT_BUDGET, "relation-list": 10, "relation-set": 3, "status-set": 2},
+    ),
+    "receive-ca-cert-relation-changed": (
+        lambda ctx, state: ctx.on.relation_changed(
+            state.get_relations("receive-ca-cert")[0], remote_unit=0
+        ),
+        # The charm tracing destination is reconfigured with the new CA bundle
+        {**INPUT_BUDGET, "pebble": 5, "relation-get": 8, "relation-ids": 7, "relation-list": 7},
+    ),
+}
+
+# Events of a started workload, with the state of its checks by name
+STARTED_WORKLOAD_CHECKS: dict[str, dict[str, dict[str, Any]]] = {
+    "login-ui-pebble-check-failed": {
+        WORKLOAD_READY_CHECK: {"status": CheckStatus.DOWN, "failures": 3, "successes": 0}
+    },
+    "login-ui-pebble-check-recovered": {
+        WORKLOAD_READY_CHECK: {"status": CheckStatus.UP, "failures": 0, "successes": 1}
+    },
+}
+
+
+@pytest.fixture
+def all_relations(
+    peer_relation: ops.testing.PeerRelation,
+    kratos_relation: ops.testing.Relation,
+    hydra_relation: ops.testing.Relation,
+    tempo_relation: ops.testing.Relation,
+    public_route_relation: ops.testing.Relation,
+    tenant_service_relation: ops.testing.Relation,
+    certificate_transfer_relation: ops.testing.Relation,
+) -> list[ops.testing.RelationBase]:
+    return [
+        peer_relation,
+        kratos_relation,
+        hydra_relation,
+        tempo_relation,
+        replace(
+            public_route_relation,
+            remote_app_data={"external_host": "example.com", "scheme": "https"},
+        ),
+        tenant_service_relation,
+        certificate_transfer_relation,
+    ]
+
+
+class TestHookToolBudget:
+    """Tests for the number of hook tool and Pebble calls made per event."""
+
+    @pytest.mark.parametrize("event_name", EVENTS)
+    def test_leader_hook_tool_budget(
+        self,
+        context: ops.testing.Context,
+        hook_tool_calls: Counter,
+        all_relations: list[ops.testing.RelationBase],
+        event_name: str,
+    ) -> None:
+        event_factory, budget = EVENTS[event_name]
+        state_in = create_state(relations=all_relations)
+        if (checks := STARTED_WORKLOAD_CHECKS.get(event_name)) is not None:
+            state_in = started_state(context, state_in, **checks)
+            hook_tool_calls.clear()
+
+        context.run(event_factory(context, state_in), state_in)
+
+        assert hook_tool_calls <= Counter(budget)
+
+    @pytest.mark.parametrize("event_name", EVENTS)
+    def test_non_leader_hook_tool_budget(
+        self,
+        context: ops.testing.Context,
+        hook_tool_calls: Counter,
+        all_relations: list[ops.testing.RelationBase],
+        event_name: str,
+    ) -> None:
+        event_factory, budget = EVENTS[event_name]
+        state_in = create_state(leader=False, relations=all_relations)
+        if (checks := STARTED_WORKLOAD_CHECKS.get(event_name)) is not None:
+            state_in = started_state(context, state_in, **checks)
+            hook_tool_calls.clear()
+
+        context.run(event_factory(context, state_in), state_in)
+
+        assert hook_tool_calls <= Counter({**budget, "relation-set": 0})
+
+    def test_update_status_without_drift_budget(
+        self,
+        context: ops.testing.Context,
+        hook_tool_calls: Counter,
+        all_relations: list[ops.testing.RelationBase],
+    ) -> None:
+        state_in = create_state(relations=all_relations)
+        state_in = context.run(context.on.update_status(), state_in)
+        hook_tool_calls.clear()
+
+        context.run(context.on.update_status(), state_in)
+
+        assert hook_tool_calls <= Counter(UPDATE_STATUS_WITHOUT_DRIFT_BUDGET)
@@ -0,0 +1,49 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+from unittest.mock import Mock
+
+import pytest
+
+from reconciler import ALL_INPUTS, Input, Reconciler
+
+
+@pytest.fixture
+def reconciler() -> Reconciler:
+    reconciler = Reconciler()
+    reconciler.add_step("cookie-key", [Input.PEERS], Mock())
+    reconciler.add_step("ca-certs", [Input.CERTIFICATES], Mock())
+    reconciler.add_step("layer", [Input.CONFIG, Input.TRACING], Mock(), after=["cookie-key"])
+    return reconciler
+
+
+def test_plan_only_includes_steps_with_changed_inputs(reconciler: Reconciler) -> None:
+    assert reconciler.plan([Input.TRACING]) == ["layer"]
+
+
+def test_plan_includes_dependent_steps(reconciler: Reconciler) -> None:
+    assert reconciler.plan([Input.PEERS]) == ["cookie-key", "layer"]
+
+
+def test_plan_all_inputs(reconciler: Reconciler) -> None:
+    assert reconciler.plan(ALL_INPUTS) == ["cookie-key", "ca-certs", "layer"]
+
+
+def test_reconcile_runs_planned_steps() -> None:
+    reconciler = Reconciler()
+    ca_certs, layer = Mock(), Mock()
+    reconciler.add_step("ca-certs", [Input.CERTIFICATES], ca_certs)
+    reconciler.add_step("layer", [Input.CONFIG], layer)
+
+    ran = reconciler.reconcile([Input.CONFIG])
+
+    assert ran == ["layer"]
+    ca_certs.assert_not_called()
+    layer.assert_called_once()
+
+
+def test_add_step_with_unknown_dependency() -> None:
+    reconciler = Reconciler()
+
+    with pytest.raises(ValueError):
+        reconciler.add_step("layer", [Input.CONFIG], Mock(), after=["cookie-key"])
@@ -1,7 +1,18 @@
 # Copyright 2023 Canonical Ltd.
 # See LICENSE file for licensing details.
 
-from utils import normalise_url
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from utils import (
+    go_runtime_environment,
+    normalise_url,
+    observes_dispatch,
+    parse_quantity,
+    relation_hooks,
+)
 
 
 def test_normalise_url_with_subpatch() -> None:
@@ -29,3 +40,67 @@ def test_normalise_url_without_trailing_slash() -> None:
     res_url = normalise_url(url)
 
     assert res_url == expected_url
+
+
+def test_relation_hooks() -> None:
+    assert relation_hooks("logging") == {
+        "logging-relation-created",
+        "logging-relation-joined",
+        "logging-relation-changed",
+        "logging-relation-departed",
+        "logging-relation-broken",
+    }
+
+
+@pytest.mark.parametrize(
+    "dispatch_path, expected",
+    [
+        ("hooks/logging-relation-joined", True),
+        ("hooks/update-status", False),
+        ("", True),
+    ],
+)
+def test_observes_dispatch(
+    monkeypatch: pytest.MonkeyPatch, dispatch_path: str, expected: bool
+) -> None:
+    monkeypatch.setenv("JUJU_DISPATCH_PATH", dispatch_path)
+
+    assert observes_dispatch(relation_hooks("logging")) is expected
+
+
+@pytest.mark.parametrize(
+    "quantity, expected",
+    [
+        ("500m", Decimal("0.5")),
+        ("2", Decimal(2)),
+        ("1.5", Decimal("1.5")),
+        ("1Gi", Decimal(2**30)),
+        ("512Mi", Decimal(512 * 2**20)),
+        ("1G", Decimal(10**9)),
+        ("1e3", Decimal(1000)),
+        ("", None),
+        (None, None),
+        ("1Xi", None),
+        ("1..5", None),
+    ],
+)
+def test_parse_quantity(quantity: Optional[str], expected: Optional[Decimal]) -> None:
+    assert parse_quantity(quantity) == expected
+
+
+def test_go_runtime_environment_from_limits() -> None:
+    assert go_runtime_environment("250m", "200Mi") == {
+        "GOMAXPROCS": "1",
+        "GOMEMLIMIT": str(int(200 * 2**20 * 0.9)),
+    }
+
+
+def test_go_runtime_environment_overrides() -> None:
+    assert go_runtime_environment("2", "1Gi", gomaxprocs=8, gomemlimit="512MiB") == {
+        "GOMAXPROCS": "8",
+        "GOMEMLIMIT": "512MiB",
+    }
+
+
+def test_go_runtime_environment_without_limits() -> None:
+    assert go_runtime_environment(None, None) == {}